@@ -101,7 +101,7 @@ def _send_ack(to_addr: str, subject: str, message_id: str) -> None:
         with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
             server.starttls()
             server.login(GATEWAY_EMAIL, GATEWAY_APP_PASSWORD)
-            server.sendmail(SMTP_FROM, to_addr, msg.as_string())
+            server.send_message(msg, from_addr=SMTP_FROM, to_addrs=[to_addr])
         log.info(f"Ack sent to {to_addr}")
     except Exception as e:
         log.warning(f"Ack send failed: {e}")
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+mail_helpers.py — Helpers shared by send_email.py, send_email_reply.py and
+send_outbound_email.py.
+"""
+
+import mimetypes
+import os
+import re
+
+# Common attachment types resolved without touching the mimetypes database.
+_FAST_MIME = {
+    ".pdf": ("application", "pdf"),
+    ".docx": ("application", "vnd.openxmlformats-officedocument.wordprocessingml.document"),
+    ".pptx": ("application", "vnd.openxmlformats-officedocument.presentationml.presentation"),
+    ".xlsx": ("application", "vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    ".png": ("image", "png"),
+    ".jpg": ("image", "jpeg"),
+    ".jpeg": ("image", "jpeg"),
+    ".txt": ("text", "plain"),
+    ".csv": ("text", "csv"),
+}
+
+
+def guess_mime(path: str) -> tuple:
+    """Return (maintype, subtype) for an attachment path."""
+    ext = os.path.splitext(path)[1].lower()
+    fast = _FAST_MIME.get(ext)
+    if fast:
+        return fast
+    mime_type, _ = mimetypes.guess_type(path)
+    return tuple((mime_type or "application/octet-stream").split("/", 1))
+
+
+# Anything markdown would render differently: headings, quotes, lists, code,
+# tables, emphasis, links. Bodies without a hit are sent as text/plain only.
+MD_HINT = re.compile(r"^[ \t]*(?:#|>|[-*+][ \t]|\d+\.[ \t])|`|\||\*\S|__|\]\(", re.MULTILINE)
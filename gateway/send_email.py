@@ -22,19 +22,14 @@ import email.mime.application
 import email.mime.base
 import email.mime.multipart
 import email.mime.text
-import mimetypes
 import os
 import smtplib
 import sys
 
+from mail_helpers import MD_HINT as _MD_HINT, guess_mime as _mime
 
-def build_html(body: str) -> str:
-    try:
-        import markdown
-        content = markdown.markdown(body, extensions=["fenced_code", "tables"])
-    except Exception:
-        content = body.replace("\n", "<br>")
-    return f"""<!DOCTYPE html><html><head><meta charset="utf-8">
+
+_HTML_TMPL = """<!DOCTYPE html><html><head><meta charset="utf-8">
 <style>
 body{{font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,sans-serif;
 max-width:700px;margin:0 auto;padding:32px 24px;background:#fff;color:#1a1a1a;line-height:1.6}}
@@ -44,6 +39,15 @@ table{{border-collapse:collapse;width:100%}}td,th{{border:1px solid #e4e4e7;padd
 </style></head><body>{content}</body></html>"""
 
 
+def build_html(body: str) -> str:
+    try:
+        import markdown
+        content = markdown.markdown(body, extensions=["fenced_code", "tables"])
+    except Exception:
+        content = body.replace("\n", "<br>")
+    return _HTML_TMPL.format_map({"content": content})
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--body", required=False, help="Reply body text, or path to a .md file")
@@ -84,7 +88,15 @@ def main():
     attachments = [f for f in (args.attach or []) if os.path.isfile(f)]
 
     # Build message
-    if attachments:
+    if not _MD_HINT.search(body):
+        # Plain text — no markdown to render, so skip the HTML alternative
+        text = email.mime.text.MIMEText(body, "plain", "utf-8")
+        if attachments:
+            msg = email.mime.multipart.MIMEMultipart("mixed")
+            msg.attach(text)
+        else:
+            msg = text
+    elif attachments:
         msg = email.mime.multipart.MIMEMultipart("mixed")
         alt = email.mime.multipart.MIMEMultipart("alternative")
         alt.attach(email.mime.text.MIMEText(body, "plain", "utf-8"))
@@ -104,8 +116,7 @@ def main():
 
     for file_path in attachments:
         try:
-            mime_type, _ = mimetypes.guess_type(file_path)
-            main_type, sub_type = (mime_type or "application/octet-stream").split("/", 1)
+            main_type, sub_type = _mime(file_path)
             with open(file_path, "rb") as f:
                 data = f.read()
             part = email.mime.base.MIMEBase(main_type, sub_type)
@@ -120,7 +131,7 @@ def main():
     with smtplib.SMTP(smtp_host, smtp_port) as server:
         server.starttls()
         server.login(gateway_email, app_password)
-        server.sendmail(gateway_email, to_addr, msg.as_string())
+        server.send_message(msg, from_addr=gateway_email, to_addrs=[to_addr])
 
     n = len(attachments)
     print(f"[send_email] Sent to {to_addr} ({n} attachment(s))")
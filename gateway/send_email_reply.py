@@ -23,16 +23,34 @@ import email.encoders
 import email.mime.base
 import email.mime.multipart
 import email.mime.text
-import mimetypes
 import os
 import re
 import smtplib
 import sys
 
+from mail_helpers import guess_mime as _mime
+
 SMTP_HOST = "smtp.gmail.com"
 SMTP_PORT = 587
 
 
+_HTML_TMPL = """<!DOCTYPE html><html><head><meta charset="utf-8">
+<style>
+body{{font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,sans-serif;
+max-width:700px;margin:0 auto;padding:32px 24px;background:#fff;color:#1a1a1a;line-height:1.6;font-size:15px}}
+h1{{font-size:22px;font-weight:700;margin:28px 0 8px}}
+h2{{font-size:18px;font-weight:600;margin:24px 0 6px}}
+h3{{font-size:15px;font-weight:600;margin:20px 0 4px}}
+p{{margin:0 0 14px}}
+pre{{background:#f4f4f5;border-radius:6px;padding:14px 16px;overflow-x:auto;font-size:13px}}
+code{{background:#f4f4f5;border-radius:4px;padding:2px 6px;font-size:13px}}
+table{{border-collapse:collapse;width:100%}}td,th{{border:1px solid #e4e4e7;padding:8px 12px}}
+.footer{{margin-top:40px;padding-top:16px;border-top:1px solid #e5e7eb;font-size:12px;color:#9ca3af}}
+</style></head><body>{content}
+<div class="footer">Sent by Sunderlabs AI Agent &middot; {smtp_from}</div>
+</body></html>"""
+
+
 def _build_html(body: str) -> str:
     try:
         import markdown
@@ -49,21 +67,7 @@ def _build_html(body: str) -> str:
         html = re.sub(r'^- (.+)$', r'<li>\1</li>', html, flags=re.MULTILINE)
         content = html.replace("\n\n", "</p><p>")
     smtp_from = os.environ.get("SMTP_FROM", os.environ.get("GATEWAY_EMAIL", ""))
-    return f"""<!DOCTYPE html><html><head><meta charset="utf-8">
-<style>
-body{{font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,sans-serif;
-max-width:700px;margin:0 auto;padding:32px 24px;background:#fff;color:#1a1a1a;line-height:1.6;font-size:15px}}
-h1{{font-size:22px;font-weight:700;margin:28px 0 8px}}
-h2{{font-size:18px;font-weight:600;margin:24px 0 6px}}
-h3{{font-size:15px;font-weight:600;margin:20px 0 4px}}
-p{{margin:0 0 14px}}
-pre{{background:#f4f4f5;border-radius:6px;padding:14px 16px;overflow-x:auto;font-size:13px}}
-code{{background:#f4f4f5;border-radius:4px;padding:2px 6px;font-size:13px}}
-table{{border-collapse:collapse;width:100%}}td,th{{border:1px solid #e4e4e7;padding:8px 12px}}
-.footer{{margin-top:40px;padding-top:16px;border-top:1px solid #e5e7eb;font-size:12px;color:#9ca3af}}
-</style></head><body>{content}
-<div class="footer">Sent by Sunderlabs AI Agent &middot; {smtp_from}</div>
-</body></html>"""
+    return _HTML_TMPL.format_map({"content": content, "smtp_from": smtp_from})
 
 
 def main():
@@ -118,8 +122,7 @@ def main():
 
     for file_path in attachments:
         try:
-            mime_type, _ = mimetypes.guess_type(file_path)
-            main_type, sub_type = (mime_type or "application/octet-stream").split("/", 1)
+            main_type, sub_type = _mime(file_path)
             with open(file_path, "rb") as f:
                 data = f.read()
             part = email.mime.base.MIMEBase(main_type, sub_type)
@@ -135,7 +138,7 @@ def main():
         with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
             server.starttls()
             server.login(gateway_email, app_password)
-            server.sendmail(smtp_from, args.to, msg.as_string())
+            server.send_message(msg, from_addr=smtp_from, to_addrs=[args.to])
     except Exception as e:
         print(f"[send_email_reply] SMTP ERROR: {e}", file=sys.stderr)
         sys.exit(3)
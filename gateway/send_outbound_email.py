@@ -12,6 +12,10 @@ Usage:
         --body "Email body text or path to a .md file" \
         [--attach /path/to/file.pdf]
 
+    Use --to-list recipients.txt (one address per line) instead of --to to
+    send the same message to several recipients over parallel SMTP
+    connections. Every address must pass the whitelist or nothing is sent.
+
 Required env vars (set automatically by gateway in agent containers):
     GATEWAY_EMAIL, GATEWAY_APP_PASSWORD
     OUTBOUND_EMAIL_WHITELIST  — comma-separated allowed recipient addresses/domains
@@ -27,25 +31,23 @@ Exit codes:
 """
 
 import argparse
+import concurrent.futures
 import email
 import email.encoders
 import email.mime.application
 import email.mime.base
 import email.mime.multipart
 import email.mime.text
-import mimetypes
+import functools
 import os
 import smtplib
 import sys
+import threading
 
+from mail_helpers import MD_HINT as _MD_HINT, guess_mime as _mime
 
-def _build_html(body: str) -> str:
-    try:
-        import markdown
-        content = markdown.markdown(body, extensions=["fenced_code", "tables"])
-    except Exception:
-        content = body.replace("\n", "<br>")
-    return f"""<!DOCTYPE html><html><head><meta charset="utf-8">
+
+_HTML_TMPL = """<!DOCTYPE html><html><head><meta charset="utf-8">
 <style>
 body{{font-family:-apple-system,BlinkMacSystemFont,'Segoe UI',Roboto,sans-serif;
 max-width:700px;margin:0 auto;padding:32px 24px;background:#fff;color:#1a1a1a;line-height:1.6}}
@@ -55,6 +57,33 @@ table{{border-collapse:collapse;width:100%}}td,th{{border:1px solid #e4e4e7;padd
 </style></head><body>{content}</body></html>"""
 
 
+def _build_html(body: str) -> str:
+    try:
+        import markdown
+        content = markdown.markdown(body, extensions=["fenced_code", "tables"])
+    except Exception:
+        content = body.replace("\n", "<br>")
+    return _HTML_TMPL.format_map({"content": content})
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_whitelist(whitelist_raw: str) -> tuple:
+    """Split the raw whitelist once into (allow_all, exact addresses, domain suffixes)."""
+    exact = set()
+    domains = []
+    for entry in whitelist_raw.split(","):
+        entry = entry.strip().lower()
+        if not entry:
+            continue
+        if entry == "*":
+            return True, frozenset(), ()
+        if entry.startswith("@"):
+            domains.append(entry)
+        else:
+            exact.add(entry)
+    return False, frozenset(exact), tuple(domains)
+
+
 def _is_whitelisted(recipient: str, whitelist_raw: str) -> bool:
     """
     Check if recipient is allowed.
@@ -68,28 +97,93 @@ def _is_whitelisted(recipient: str, whitelist_raw: str) -> bool:
     if not whitelist_raw or not whitelist_raw.strip():
         return False  # empty whitelist = deny all
 
-    for entry in whitelist_raw.split(","):
-        entry = entry.strip().lower()
-        if not entry:
-            continue
-        if entry == "*":
-            return True
-        if entry.startswith("@"):
-            # domain wildcard: @sunderlabs.com matches foo@sunderlabs.com
-            if recipient.endswith(entry):
-                return True
-        else:
-            if recipient == entry:
-                return True
-    return False
+    allow_all, exact, domains = _parse_whitelist(whitelist_raw)
+    # domain wildcard: @sunderlabs.com matches foo@sunderlabs.com
+    return allow_all or recipient in exact or recipient.endswith(domains)
+
+
+def _read_recipients(to: str, to_list: str) -> list:
+    if to:
+        return [to.strip()]
+    with open(to_list, "r", encoding="utf-8") as f:
+        raw = f.read()
+    # One address per line; commas and blank lines are tolerated. Addresses
+    # compare case-insensitively (as in the whitelist), so dedupe on lowercase.
+    return list(dict.fromkeys(rcpt.lower() for rcpt in raw.replace(",", " ").split()))
+
+
+def _log_outreach(recipient: str, subject: str) -> None:
+    try:
+        import datetime
+        log_dir = "/home/picoclaw/.picoclaw/workspace/leads"
+        os.makedirs(log_dir, exist_ok=True)
+        log_path = os.path.join(log_dir, "outreach-log.md")
+        dt = datetime.datetime.now(datetime.timezone.utc)
+        ts = f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d} UTC"
+        entry = f"- `{ts}` → **{recipient}** | {subject}\n"
+        # Single O_APPEND write so concurrent senders never interleave lines
+        fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, entry.encode("utf-8"))
+        finally:
+            os.close(fd)
+    except Exception:
+        pass
+
+
+class _SMTPPool:
+    """One authenticated SMTP connection per worker thread, reused across sends."""
+
+    def __init__(self, host: str, port: int, user: str, password: str):
+        self._host = host
+        self._port = port
+        self._user = user
+        self._password = password
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._servers = []
+
+    def get(self) -> smtplib.SMTP:
+        server = getattr(self._local, "server", None)
+        if server is None:
+            server = smtplib.SMTP(self._host, self._port)
+            server.starttls()
+            server.login(self._user, self._password)
+            self._local.server = server
+            with self._lock:
+                self._servers.append(server)
+        return server
+
+    def discard(self) -> None:
+        server = getattr(self._local, "server", None)
+        self._local.server = None
+        if server is not None:
+            with self._lock:
+                self._servers.remove(server)
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def close(self) -> None:
+        with self._lock:
+            servers, self._servers = self._servers, []
+        for server in servers:
+            try:
+                server.quit()
+            except Exception:
+                pass
 
 
 def main():
     parser = argparse.ArgumentParser(description="Send an outbound email (whitelist-gated)")
-    parser.add_argument("--to", required=True, help="Recipient email address")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--to", help="Recipient email address")
+    target.add_argument("--to-list", help="File with one recipient address per line")
     parser.add_argument("--subject", required=True, help="Email subject")
     parser.add_argument("--body", required=False, help="Body text or path to a .md file")
     parser.add_argument("--attach", nargs="*", default=[], help="File paths to attach")
+    parser.add_argument("--workers", type=int, default=8, help="Parallel SMTP connections for --to-list")
     args = parser.parse_args()
 
     # ── Credentials from env ────────────────────────────────────────────────
@@ -107,11 +201,25 @@ def main():
         )
         sys.exit(2)
 
+    try:
+        recipients = _read_recipients(args.to, args.to_list)
+    except OSError as e:
+        print(f"[send_outbound_email] ERROR: cannot read --to-list: {e}", file=sys.stderr)
+        sys.exit(2)
+    if not recipients:
+        print("[send_outbound_email] ERROR: no recipients provided", file=sys.stderr)
+        sys.exit(2)
+
     # ── Whitelist check ─────────────────────────────────────────────────────
-    recipient = args.to.strip()
-    if not _is_whitelisted(recipient, whitelist_raw):
+    # Any blocked address rejects the whole batch before anything is sent.
+    blocked = [r for r in recipients if not _is_whitelisted(r, whitelist_raw)]
+    if blocked:
+        for recipient in blocked:
+            print(
+                f"[send_outbound_email] BLOCKED: '{recipient}' is not in OUTBOUND_EMAIL_WHITELIST.",
+                file=sys.stderr,
+            )
         print(
-            f"[send_outbound_email] BLOCKED: '{recipient}' is not in OUTBOUND_EMAIL_WHITELIST.\n"
             f"  Whitelist: {whitelist_raw or '(empty — all blocked)'}\n"
             f"  To add this recipient, update OUTBOUND_EMAIL_WHITELIST in the gateway env.",
             file=sys.stderr,
@@ -134,7 +242,15 @@ def main():
     # ── Build message ───────────────────────────────────────────────────────
     attachments = [f for f in (args.attach or []) if os.path.isfile(f)]
 
-    if attachments:
+    if not _MD_HINT.search(body):
+        # Plain text — no markdown to render, so skip the HTML alternative
+        text = email.mime.text.MIMEText(body, "plain", "utf-8")
+        if attachments:
+            msg = email.mime.multipart.MIMEMultipart("mixed")
+            msg.attach(text)
+        else:
+            msg = text
+    elif attachments:
         msg = email.mime.multipart.MIMEMultipart("mixed")
         alt = email.mime.multipart.MIMEMultipart("alternative")
         alt.attach(email.mime.text.MIMEText(body, "plain", "utf-8"))
@@ -146,13 +262,11 @@ def main():
         msg.attach(email.mime.text.MIMEText(_build_html(body), "html", "utf-8"))
 
     msg["From"] = smtp_from
-    msg["To"] = recipient
     msg["Subject"] = args.subject
 
     for file_path in attachments:
         try:
-            mime_type, _ = mimetypes.guess_type(file_path)
-            main_type, sub_type = (mime_type or "application/octet-stream").split("/", 1)
+            main_type, sub_type = _mime(file_path)
             with open(file_path, "rb") as f:
                 data = f.read()
             part = email.mime.base.MIMEBase(main_type, sub_type)
@@ -167,30 +281,35 @@ def main():
             print(f"[send_outbound_email] WARNING: could not attach {file_path}: {e}", file=sys.stderr)
 
     # ── Send ────────────────────────────────────────────────────────────────
-    try:
-        with smtplib.SMTP(smtp_host, smtp_port) as server:
-            server.starttls()
-            server.login(gateway_email, app_password)
-            server.sendmail(smtp_from, recipient, msg.as_string())
-    except Exception as e:
-        print(f"[send_outbound_email] SMTP ERROR: {e}", file=sys.stderr)
-        sys.exit(3)
-
+    pool = _SMTPPool(smtp_host, smtp_port, gateway_email, app_password)
     n = len(attachments)
-    print(f"[send_outbound_email] Sent to {recipient} from {smtp_from} ({n} attachment(s))")
+    # Serialize the MIME tree once; each recipient only gets its own To header
+    # prepended to the wire bytes.
+    data = msg.as_bytes(policy=msg.policy.clone(linesep="\r\n"))
+
+    def _send_one(recipient: str) -> bool:
+        try:
+            pool.get().sendmail(smtp_from, [recipient], f"To: {recipient}\r\n".encode() + data)
+        except Exception as e:
+            pool.discard()
+            print(f"[send_outbound_email] SMTP ERROR ({recipient}): {e}", file=sys.stderr)
+            return False
+        print(f"[send_outbound_email] Sent to {recipient} from {smtp_from} ({n} attachment(s))")
+        _log_outreach(recipient, args.subject)
+        return True
 
-    # ── Log to outreach log ─────────────────────────────────────────────────
     try:
-        import datetime
-        log_dir = "/home/picoclaw/.picoclaw/workspace/leads"
-        os.makedirs(log_dir, exist_ok=True)
-        log_path = os.path.join(log_dir, "outreach-log.md")
-        ts = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
-        entry = f"- `{ts}` → **{recipient}** | {args.subject}\n"
-        with open(log_path, "a", encoding="utf-8") as f:
-            f.write(entry)
-    except Exception:
-        pass
+        if len(recipients) == 1:
+            results = [_send_one(recipients[0])]
+        else:
+            workers = max(1, min(args.workers, len(recipients)))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as ex:
+                results = list(ex.map(_send_one, recipients))
+    finally:
+        pool.close()
+
+    if not all(results):
+        sys.exit(3)
 
 
 if __name__ == "__main__":
@@ -35,10 +35,22 @@ import argparse
 import mimetypes
 import os
 import sys
-import json
 import urllib.request
 import urllib.error
 
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:  # stdlib fallback when orjson isn't installed
+    import json
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _json_loads = json.loads
+
 
 def _api_base() -> str:
     token = os.environ.get("TELEGRAM_BOT_TOKEN", "")
@@ -52,7 +64,7 @@ def _send_text(api_base: str, chat_id: str, text: str) -> None:
     MAX = 4096
     for i in range(0, max(1, len(text)), MAX):
         chunk = text[i:i + MAX]
-        data = json.dumps({"chat_id": chat_id, "text": chunk}).encode()
+        data = _json_dumps({"chat_id": chat_id, "text": chunk})
         req = urllib.request.Request(
             f"{api_base}/sendMessage",
             data=data,
@@ -60,7 +72,7 @@ def _send_text(api_base: str, chat_id: str, text: str) -> None:
         )
         try:
             with urllib.request.urlopen(req, timeout=30) as resp:
-                result = json.loads(resp.read())
+                result = _json_loads(resp.read())
                 if not result.get("ok"):
                     print(f"[send_telegram_file] sendMessage failed: {result}", file=sys.stderr)
                     sys.exit(2)
@@ -121,7 +133,7 @@ def _send_file(api_base: str, chat_id: str, path: str, caption: str = "") -> Non
     )
     try:
         with urllib.request.urlopen(req, timeout=60) as resp:
-            result = json.loads(resp.read())
+            result = _json_loads(resp.read())
             if not result.get("ok"):
                 print(f"[send_telegram_file] {method} failed: {result}", file=sys.stderr)
                 sys.exit(2)
@@ -10,7 +10,7 @@ Usage:
   sunderlabs leads delete <id>
   sunderlabs leads discover --category CAT --location LOC [--limit N] [--icp TEXT] [--enrich]
   sunderlabs leads batch [--limit N]
-  sunderlabs leads batch-status <batch_id>
+  sunderlabs leads batch-status <batch_id> [<batch_id> ...]
 
   sunderlabs kanban list [--assignee A] [--status S] [--tenant TENANT]
   sunderlabs kanban get <id>
@@ -33,85 +33,265 @@ Usage:
   sunderlabs config set-url URL
   sunderlabs config set-token TOKEN
   sunderlabs config show
+  sunderlabs --version
+
+Read-only commands (entities, release list/assets) cache responses for a
+short time; pass --no-cache before the command group to bypass it.
 
 Environment variables (override config file):
   SUNDERLABS_API_URL    — Studio API base URL (e.g. https://studio.sunderlabs.com)
   SUNDERLABS_API_TOKEN  — Bearer token for authentication
+  SUNDERLABS_CACHE_TTL  — GET cache lifetime in seconds (default 60, 0 disables)
 """
 
-import argparse
+from __future__ import annotations
+
+import functools
 import json
 import os
 import sys
-import urllib.request
-import urllib.error
+import threading
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import argparse
+
+__version__ = "0.1.0"
+
+try:
+    import orjson
+
+    def _json_dumps(obj, pretty: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(obj, default=str, option=option)
+
+    _json_loads = orjson.loads
+except ImportError:  # stdlib fallback when orjson isn't installed
+    def _json_dumps(obj, pretty: bool = False) -> bytes:
+        if pretty:
+            return json.dumps(obj, indent=2, default=str).encode()
+        return json.dumps(obj, separators=(",", ":"), default=str).encode()
+
+    _json_loads = json.loads
 
 # ─── Config ──────────────────────────────────────────────────────────────────
 
-CONFIG_PATH = Path.home() / ".sunderlabs" / "config.json"
 DEFAULT_URL = "http://localhost:3000"
 
 
-def load_config() -> dict:
+@functools.lru_cache(maxsize=1)
+def _config_path() -> Path:
+    # Resolved on first use rather than at import: Path.home() may go through getpwuid.
+    return Path.home() / ".sunderlabs" / "config.json"
+
+
+@functools.lru_cache(maxsize=1)
+def _read_config() -> dict:
     cfg = {}
-    if CONFIG_PATH.exists():
+    path = _config_path()
+    if path.exists():
         try:
-            cfg = json.loads(CONFIG_PATH.read_text())
+            cfg = _json_loads(path.read_bytes())
         except Exception:
             pass
     return cfg
 
 
+def load_config() -> dict:
+    # The file is read once per process; callers get a copy they may mutate.
+    return dict(_read_config())
+
+
 def save_config(cfg: dict):
-    CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    CONFIG_PATH.write_text(json.dumps(cfg, indent=2))
+    path = _config_path()
+    token_changed = cfg.get("api_token") != _read_config().get("api_token")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(_json_dumps(cfg, pretty=True))
+    _read_config.cache_clear()
+    global _BASE_URL
+    _BASE_URL = None
+    if token_changed:
+        # Cached responses were fetched with the old token's permissions
+        _invalidate_cache()
+
+
+@functools.lru_cache(maxsize=1)
+def _env() -> dict:
+    """Snapshot of the SUNDERLABS_* variables; the environment doesn't change mid-run."""
+    return {
+        "url": os.environ.get("SUNDERLABS_API_URL"),
+        "token": os.environ.get("SUNDERLABS_API_TOKEN"),
+        "cache_ttl": os.environ.get("SUNDERLABS_CACHE_TTL"),
+    }
 
 
 def get_base_url() -> str:
     return (
-        os.environ.get("SUNDERLABS_API_URL")
+        _env()["url"]
         or load_config().get("api_url")
         or DEFAULT_URL
     ).rstrip("/")
 
 
 def get_token() -> str | None:
-    return os.environ.get("SUNDERLABS_API_TOKEN") or load_config().get("api_token")
+    return _env()["token"] or load_config().get("api_token")
 
 
 # ─── HTTP helpers ─────────────────────────────────────────────────────────────
 
+# Base URL and token resolved once per process (see _api_target)
+_BASE_URL: str | None = None
+_TOKEN: str | None = None
+
+
+def _api_target() -> tuple[str, str | None]:
+    global _BASE_URL, _TOKEN
+    if _BASE_URL is None:
+        _BASE_URL = get_base_url()
+        _TOKEN = get_token()
+    return _BASE_URL, _TOKEN
+
+
+# One keep-alive connection per thread (the main thread, or _request_many workers)
+_LOCAL = threading.local()
+
+
+_MAX_REDIRECTS = 5
+
+
+def _open_connection(parts):
+    # Deferred: http.client pulls in ssl/email, which config, kanban and
+    # --help invocations never need.
+    import http.client
+
+    if parts.scheme == "https":
+        return http.client.HTTPSConnection(parts.netloc, timeout=120)
+    return http.client.HTTPConnection(parts.netloc, timeout=120)
+
+
+def _connection(base: str):
+    """Return this thread's keep-alive connection to the Studio API."""
+    conn = getattr(_LOCAL, "conn", None)
+    if conn is None:
+        import urllib.parse
+
+        conn = _LOCAL.conn = _open_connection(urllib.parse.urlsplit(base))
+    return conn
+
+
+def _reset_connection():
+    conn = getattr(_LOCAL, "conn", None)
+    if conn is not None:
+        conn.close()
+        _LOCAL.conn = None
+
+
+def _send(base: str, method: str, target: str, data: bytes | None, headers: dict):
+    """Send one request on this thread's connection to base; return (resp, body)."""
+    import http.client
+
+    for attempt in range(2):
+        conn = _connection(base)
+        reused = conn.sock is not None
+        try:
+            conn.request(method, target, body=data, headers=headers)
+            resp = conn.getresponse()
+            return resp, resp.read()
+        except (http.client.HTTPException, ConnectionError) as e:
+            _reset_connection()
+            if reused and attempt == 0:
+                continue  # server dropped an idle keep-alive socket; retry on a fresh one
+            _die(f"Cannot reach {base}: {e}")
+        except OSError as e:
+            _reset_connection()
+            _die(f"Cannot reach {base}: {e}")
+
+
+def _send_once(parts, method: str, target: str, headers: dict):
+    """Send one request on a throwaway connection (redirect to another scheme/port)."""
+    import http.client
+
+    conn = _open_connection(parts)
+    try:
+        conn.request(method, target, headers=headers)
+        resp = conn.getresponse()
+        return resp, resp.read()
+    except (http.client.HTTPException, OSError) as e:
+        _die(f"Cannot reach {parts.scheme}://{parts.netloc}: {e}")
+    finally:
+        conn.close()
+
+
 def _request(method: str, path: str, body: dict | None = None, params: dict | None = None) -> dict:
-    base = get_base_url()
-    url = f"{base}{path}"
+    import urllib.parse
+
+    base, token = _api_target()
+    origin = urllib.parse.urlsplit(base)
 
     if params:
-        qs = "&".join(f"{k}={urllib.parse.quote(str(v))}" for k, v in params.items() if v is not None)
+        filtered = {k: v for k, v in params.items() if v is not None}
+        qs = urllib.parse.urlencode(filtered, safe="/", quote_via=urllib.parse.quote)
         if qs:
-            url = f"{url}?{qs}"
+            path = f"{path}?{qs}"
 
-    data = json.dumps(body).encode() if body is not None else None
+    data = _json_dumps(body) if body is not None else None
     headers = {"Content-Type": "application/json", "Accept": "application/json"}
-    token = get_token()
     if token:
         headers["Authorization"] = f"Bearer {token}"
 
-    req = urllib.request.Request(url, data=data, headers=headers, method=method)
-    try:
-        with urllib.request.urlopen(req, timeout=120) as resp:
-            return json.loads(resp.read())
-    except urllib.error.HTTPError as e:
+    resp, raw = _send(base, method, origin.path + path, data, headers)
+
+    # Follow GET redirects on the same host, as urlopen did (http -> https,
+    # trailing slash); a scheme or port change gets its own connection.
+    url = base + path
+    for _ in range(_MAX_REDIRECTS):
+        location = resp.getheader("Location")
+        if method != "GET" or not 300 <= resp.status < 400 or not location:
+            break
+        next_url = urllib.parse.urljoin(url, location)
+        parts = urllib.parse.urlsplit(next_url)
+        if parts.hostname != origin.hostname or parts.scheme not in ("http", "https"):
+            break
+        url = next_url
+        target = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        if (parts.scheme, parts.netloc) == (origin.scheme, origin.netloc):
+            resp, raw = _send(base, method, target, None, headers)
+        else:
+            resp, raw = _send_once(parts, method, target, headers)
+
+    if 300 <= resp.status < 400:
+        _die(
+            f"HTTP {resp.status}: redirected to {resp.getheader('Location')} "
+            f"(update the API URL with: sunderlabs config set-url)"
+        )
+    if resp.status >= 400:
         try:
-            err = json.loads(e.read())
+            err = _json_loads(raw)
         except Exception:
-            err = {"error": str(e)}
-        _die(f"HTTP {e.code}: {err.get('error') or err.get('detail') or json.dumps(err)}")
-    except urllib.error.URLError as e:
-        _die(f"Cannot reach {base}: {e.reason}")
+            err = {"error": f"HTTP Error {resp.status}: {resp.reason}"}
+        _die(f"HTTP {resp.status}: {err.get('error') or err.get('detail') or _json_dumps(err).decode()}")
+    if method != "GET":
+        _invalidate_cache()
+    return _json_loads(raw)
+
 
+def _request_many(calls: list[tuple], max_workers: int = 8) -> list[dict]:
+    """
+    Run several (method, path, body, params) requests concurrently.
 
-import urllib.parse  # noqa: E402 (needed after _request definition)
+    Results come back in call order; each worker thread keeps its own
+    connection, so N independent calls cost about one round trip.
+    """
+    if len(calls) == 1:
+        return [_request(*calls[0])]
+    import concurrent.futures
+
+    workers = max(1, min(max_workers, len(calls)))
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = [ex.submit(_request, *call) for call in calls]
+        results = [f.result() for f in futures]
+    return results
 
 
 def _get(path: str, params: dict | None = None) -> dict:
@@ -130,6 +310,77 @@ def _delete(path: str, params: dict | None = None) -> dict:
     return _request("DELETE", path, params=params)
 
 
+# ─── GET cache ────────────────────────────────────────────────────────────────
+
+_USE_CACHE = True
+_MEMO: dict[str, dict] = {}
+
+
+def _cache_ttl() -> float:
+    try:
+        return float(_env()["cache_ttl"] or "60")
+    except ValueError:
+        return 60.0
+
+
+def _cache_dir() -> Path:
+    return _config_path().parent / "cache"
+
+
+def _cached_get(path: str, params: dict | None = None) -> dict:
+    """
+    _get for idempotent read endpoints.
+
+    Responses are memoized in-process and on disk under ~/.sunderlabs/cache
+    for SUNDERLABS_CACHE_TTL seconds (default 60, 0 disables). Any mutating
+    request clears the cache.
+    """
+    ttl = _cache_ttl()
+    if not _USE_CACHE or ttl <= 0:
+        return _get(path, params)
+
+    import hashlib
+    import time
+    import urllib.parse
+
+    filtered = sorted((k, v) for k, v in (params or {}).items() if v is not None)
+    base, token = _api_target()
+    # The token is part of the key so one token never sees another's responses
+    raw_key = f"{token or ''}\n{base}{path}?{urllib.parse.urlencode(filtered)}"
+    key = hashlib.sha1(raw_key.encode()).hexdigest()
+    if key in _MEMO:
+        return _MEMO[key]
+
+    cache_file = _cache_dir() / f"{key}.json"
+    try:
+        if time.time() - cache_file.stat().st_mtime < ttl:
+            result = _json_loads(cache_file.read_bytes())
+            _MEMO[key] = result
+            return result
+    except (OSError, ValueError):
+        pass
+
+    result = _get(path, params)
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_name(f"{key}.{os.getpid()}.tmp")
+        tmp.write_bytes(_json_dumps(result))
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass
+    _MEMO[key] = result
+    return result
+
+
+def _invalidate_cache():
+    _MEMO.clear()
+    try:
+        for cache_file in _cache_dir().glob("*.json"):
+            cache_file.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+
 # ─── Output helpers ───────────────────────────────────────────────────────────
 
 def _die(msg: str):
@@ -142,22 +393,24 @@ def _ok(msg: str):
 
 
 def _json(data):
-    print(json.dumps(data, indent=2, default=str))
+    # Pretty-print for humans; compact when piped into jq or another program
+    print(_json_dumps(data, pretty=sys.stdout.isatty()).decode())
 
 
 def _table(rows: list[dict], cols: list[str]):
     if not rows:
         print("(no results)")
         return
-    widths = {c: len(c) for c in cols}
-    for row in rows:
-        for c in cols:
-            widths[c] = max(widths[c], len(str(row.get(c, "") or "")))
-    header = "  ".join(c.upper().ljust(widths[c]) for c in cols)
-    print(header)
-    print("  ".join("-" * widths[c] for c in cols))
-    for row in rows:
-        print("  ".join(str(row.get(c, "") or "").ljust(widths[c]) for c in cols))
+    # Stringify every cell once into positional tuples; widths come from a
+    # column-wise pass over the transposed rows, with no dict access.
+    cells = [tuple(str(row.get(c, "") or "") for c in cols) for row in rows]
+    widths = [max(len(c), max(map(len, col))) for c, col in zip(cols, zip(*cells))]
+    out = [
+        "  ".join(c.upper().ljust(w) for c, w in zip(cols, widths)),
+        "  ".join("-" * w for w in widths),
+    ]
+    out.extend("  ".join(val.ljust(w) for val, w in zip(line, widths)) for line in cells)
+    sys.stdout.write("\n".join(out) + "\n")
 
 
 # ─── Leads ────────────────────────────────────────────────────────────────────
@@ -182,30 +435,37 @@ def cmd_leads_get(args):
     _json(r)
 
 
+# (argparse dest, API body key) — only options the user actually passed are sent
+_LEAD_CREATE_FIELDS = (
+    ("name", "name"),
+    ("company", "company"),
+    ("title", "title"),
+    ("email", "email"),
+    ("linkedin", "linkedin_url"),
+    ("status", "status"),
+    ("source", "source"),
+    ("score", "score"),
+    ("notes", "notes"),
+)
+_LEAD_UPDATE_FIELDS = (
+    ("status", "status"),
+    ("score", "score"),
+    ("notes", "notes"),
+    ("email", "email"),
+)
+
+
+def _body_from_args(args, fields: tuple) -> dict:
+    return {key: getattr(args, dest) for dest, key in fields if getattr(args, dest, None) is not None}
+
+
 def cmd_leads_create(args):
-    body = {"name": args.name}
-    for field in ["company", "title", "email", "linkedin_url", "status", "source", "notes"]:
-        val = getattr(args, field.replace("linkedin_url", "linkedin"), None)
-        if field == "linkedin_url":
-            val = getattr(args, "linkedin", None)
-        if val is not None:
-            body[field] = val
-    if args.score is not None:
-        body["score"] = args.score
-    r = _post("/api/leads", body)
+    r = _post("/api/leads", _body_from_args(args, _LEAD_CREATE_FIELDS))
     _ok(f"Lead created: {r.get('id')}")
 
 
 def cmd_leads_update(args):
-    body = {}
-    if args.status:
-        body["status"] = args.status
-    if args.score is not None:
-        body["score"] = args.score
-    if args.notes:
-        body["notes"] = args.notes
-    if args.email:
-        body["email"] = args.email
+    body = _body_from_args(args, _LEAD_UPDATE_FIELDS)
     if args.tags:
         body["tags"] = [t.strip() for t in args.tags.split(",")]
     r = _patch(f"/api/leads/{args.id}", body)
@@ -241,8 +501,9 @@ def cmd_leads_batch(args):
 
 
 def cmd_leads_batch_status(args):
-    r = _get(f"/api/leads/discover", {"batch_id": args.batch_id})
-    _json(r)
+    calls = [("GET", "/api/leads/discover", None, {"batch_id": b}) for b in args.batch_id]
+    results = _request_many(calls)
+    _json(results[0] if len(results) == 1 else results)
 
 
 # ─── Kanban ───────────────────────────────────────────────────────────────────
@@ -250,7 +511,17 @@ def cmd_leads_batch_status(args):
 KANBAN_BIN = "/home/picoclaw/kanban.py"
 
 
-def _kanban(subcmd: list[str]) -> str:
+@functools.lru_cache(maxsize=1)
+def _load_kanban_module():
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location("kanban", KANBAN_BIN)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def _kanban_subprocess(subcmd: list[str]) -> str:
     import subprocess
     result = subprocess.run(
         ["python3", KANBAN_BIN] + subcmd,
@@ -261,6 +532,36 @@ def _kanban(subcmd: list[str]) -> str:
     return result.stdout.strip()
 
 
+def _kanban(subcmd: list[str]) -> str:
+    # Run kanban.py's CLI in-process instead of paying for a second interpreter;
+    # only fall back to a subprocess if the module itself can't be loaded.
+    try:
+        kanban_mod = _load_kanban_module()
+    except Exception:
+        return _kanban_subprocess(subcmd)
+
+    import contextlib
+    import io
+
+    out, err = io.StringIO(), io.StringIO()
+    saved_argv = sys.argv
+    sys.argv = [KANBAN_BIN] + subcmd
+    code = 0
+    try:
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            kanban_mod._cli()
+    except SystemExit as e:
+        code = e.code
+    except Exception as e:
+        code = 1
+        err.write(f"kanban.py failed: {e}")
+    finally:
+        sys.argv = saved_argv
+    if code not in (0, None):
+        _die(err.getvalue().strip() or "kanban.py failed")
+    return out.getvalue().strip()
+
+
 def cmd_kanban_list(args):
     subcmd = ["list"]
     if args.assignee:
@@ -351,7 +652,7 @@ def cmd_social_generate(args):
 # ─── Release ──────────────────────────────────────────────────────────────────
 
 def cmd_release_list(args):
-    r = _get("/api/release", {"artistSlug": args.artist})
+    r = _cached_get("/api/release", {"artistSlug": args.artist})
     releases = r if isinstance(r, list) else r.get("releases", [r])
     _table(releases, ["slug", "title", "status", "created_at"])
 
@@ -360,7 +661,8 @@ def cmd_release_assets(args):
     params = {"artistSlug": args.artist, "releaseSlug": args.release}
     if args.refresh:
         params["refresh"] = "1"
-    r = _get("/api/release-files", params)
+    # --refresh asks the server to rebuild the listing, so never serve it from cache
+    r = _get("/api/release-files", params) if args.refresh else _cached_get("/api/release-files", params)
     files = r.get("files", [])
     _table(files, ["object_path", "size_bytes", "updated_at"])
 
@@ -377,13 +679,13 @@ def cmd_entities_list(args):
     params = {}
     if args.type:
         params["type"] = args.type
-    r = _get("/api/entities", params)
+    r = _cached_get("/api/entities", params)
     entities = r if isinstance(r, list) else r.get("entities", [r])
     _table(entities, ["slug", "name", "type", "tags"])
 
 
 def cmd_entities_get(args):
-    r = _get(f"/api/entities/{args.slug}")
+    r = _cached_get(f"/api/entities/{args.slug}")
     _json(r)
 
 
@@ -408,11 +710,11 @@ def cmd_config_show(args):
     token = cfg.get("api_token", "")
     if token:
         cfg["api_token"] = token[:8] + "..." + token[-4:] if len(token) > 12 else "***"
-    print(f"Config file : {CONFIG_PATH}")
+    print(f"Config file : {_config_path()}")
     print(f"API URL     : {get_base_url()}")
     print(f"Token       : {cfg.get('api_token', '(not set)')}")
-    env_url = os.environ.get("SUNDERLABS_API_URL")
-    env_tok = os.environ.get("SUNDERLABS_API_TOKEN")
+    env_url = _env()["url"]
+    env_tok = _env()["token"]
     if env_url:
         print(f"Env URL     : {env_url}  (overrides config)")
     if env_tok:
@@ -421,30 +723,23 @@ def cmd_config_show(args):
 
 # ─── Argument parser ──────────────────────────────────────────────────────────
 
-def build_parser() -> argparse.ArgumentParser:
-    p = argparse.ArgumentParser(
-        prog="sunderlabs",
-        description="Sunderlabs Studio CLI",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-    )
-    sub = p.add_subparsers(dest="group", required=True)
-
-    # ── leads ──
-    leads = sub.add_parser("leads", help="Lead management & discovery")
-    lsub = leads.add_subparsers(dest="cmd", required=True)
-
-    ll = lsub.add_parser("list", help="List leads")
+def _add_leads_list(sub):
+    ll = sub.add_parser("list", help="List leads")
     ll.add_argument("--status", help="Filter by status (new/contacted/qualified/disqualified)")
     ll.add_argument("--source", help="Filter by source")
     ll.add_argument("--q", help="Search query")
     ll.add_argument("--limit", type=int, default=50)
     ll.set_defaults(func=cmd_leads_list)
 
-    lg = lsub.add_parser("get", help="Get lead by ID")
+
+def _add_leads_get(sub):
+    lg = sub.add_parser("get", help="Get lead by ID")
     lg.add_argument("id")
     lg.set_defaults(func=cmd_leads_get)
 
-    lc = lsub.add_parser("create", help="Create a lead")
+
+def _add_leads_create(sub):
+    lc = sub.add_parser("create", help="Create a lead")
     lc.add_argument("--name", required=True)
     lc.add_argument("--company")
     lc.add_argument("--title")
@@ -456,7 +751,9 @@ def build_parser() -> argparse.ArgumentParser:
     lc.add_argument("--notes")
     lc.set_defaults(func=cmd_leads_create)
 
-    lu = lsub.add_parser("update", help="Update a lead")
+
+def _add_leads_update(sub):
+    lu = sub.add_parser("update", help="Update a lead")
     lu.add_argument("id")
     lu.add_argument("--status")
     lu.add_argument("--score", type=int)
@@ -465,11 +762,15 @@ def build_parser() -> argparse.ArgumentParser:
     lu.add_argument("--tags", help="Comma-separated tags")
     lu.set_defaults(func=cmd_leads_update)
 
-    ld = lsub.add_parser("delete", help="Delete a lead")
+
+def _add_leads_delete(sub):
+    ld = sub.add_parser("delete", help="Delete a lead")
     ld.add_argument("id")
     ld.set_defaults(func=cmd_leads_delete)
 
-    ldis = lsub.add_parser("discover", help="Start lead discovery pipeline")
+
+def _add_leads_discover(sub):
+    ldis = sub.add_parser("discover", help="Start lead discovery pipeline")
     ldis.add_argument("--category", required=True, help="Business category (e.g. 'Steuerberater')")
     ldis.add_argument("--location", required=True, help="Location (e.g. 'München')")
     ldis.add_argument("--limit", type=int, default=20)
@@ -477,29 +778,35 @@ def build_parser() -> argparse.ArgumentParser:
     ldis.add_argument("--enrich", action="store_true", help="Enrich via Handelsregister")
     ldis.set_defaults(func=cmd_leads_discover)
 
-    lb = lsub.add_parser("batch", help="List recent discovery batches")
+
+def _add_leads_batch(sub):
+    lb = sub.add_parser("batch", help="List recent discovery batches")
     lb.add_argument("--limit", type=int, default=20)
     lb.set_defaults(func=cmd_leads_batch)
 
-    lbs = lsub.add_parser("batch-status", help="Check discovery batch status")
-    lbs.add_argument("batch_id")
+
+def _add_leads_batch_status(sub):
+    lbs = sub.add_parser("batch-status", help="Check discovery batch status")
+    lbs.add_argument("batch_id", nargs="+", help="One or more batch IDs (polled concurrently)")
     lbs.set_defaults(func=cmd_leads_batch_status)
 
-    # ── kanban ──
-    kanban = sub.add_parser("kanban", help="Kanban task management")
-    ksub = kanban.add_subparsers(dest="cmd", required=True)
 
-    kl = ksub.add_parser("list", help="List tasks")
+def _add_kanban_list(sub):
+    kl = sub.add_parser("list", help="List tasks")
     kl.add_argument("--assignee")
     kl.add_argument("--status")
     kl.add_argument("--tenant", default="dev")
     kl.set_defaults(func=cmd_kanban_list)
 
-    kg = ksub.add_parser("get", help="Get task by ID")
+
+def _add_kanban_get(sub):
+    kg = sub.add_parser("get", help="Get task by ID")
     kg.add_argument("id")
     kg.set_defaults(func=cmd_kanban_get)
 
-    kc = ksub.add_parser("create", help="Create a task")
+
+def _add_kanban_create(sub):
+    kc = sub.add_parser("create", help="Create a task")
     kc.add_argument("--title", required=True)
     kc.add_argument("--assignee")
     kc.add_argument("--tenant", default="dev")
@@ -507,7 +814,9 @@ def build_parser() -> argparse.ArgumentParser:
     kc.add_argument("--priority", choices=["low", "medium", "high"], default="medium")
     kc.set_defaults(func=cmd_kanban_create)
 
-    ku = ksub.add_parser("update", help="Update a task")
+
+def _add_kanban_update(sub):
+    ku = sub.add_parser("update", help="Update a task")
     ku.add_argument("id")
     ku.add_argument("--status", choices=["todo", "in_progress", "done", "blocked"])
     ku.add_argument("--assignee")
@@ -515,96 +824,198 @@ def build_parser() -> argparse.ArgumentParser:
     ku.add_argument("--notes")
     ku.set_defaults(func=cmd_kanban_update)
 
-    kp = ksub.add_parser("poll", help="Poll tasks for an assignee")
+
+def _add_kanban_poll(sub):
+    kp = sub.add_parser("poll", help="Poll tasks for an assignee")
     kp.add_argument("--assignee", required=True)
     kp.add_argument("--tenant", default="dev")
     kp.add_argument("--status", default="todo")
     kp.set_defaults(func=cmd_kanban_poll)
 
-    kh = ksub.add_parser("handoff", help="Hand off task to another persona")
+
+def _add_kanban_handoff(sub):
+    kh = sub.add_parser("handoff", help="Hand off task to another persona")
     kh.add_argument("id")
     kh.add_argument("--to", required=True, help="Target persona (e.g. mia)")
     kh.add_argument("--title")
     kh.set_defaults(func=cmd_kanban_handoff)
 
-    # ── meme ──
-    meme = sub.add_parser("meme", help="Meme generation")
-    msub = meme.add_subparsers(dest="cmd", required=True)
-    mg = msub.add_parser("generate", help="Generate a meme")
+
+def _add_meme_generate(sub):
+    mg = sub.add_parser("generate", help="Generate a meme")
     mg.add_argument("--entity", required=True, help="Entity slug")
     mg.add_argument("--topic", required=True)
     mg.add_argument("--style")
     mg.set_defaults(func=cmd_meme_generate)
 
-    # ── carousel ──
-    carousel = sub.add_parser("carousel", help="Carousel generation")
-    csub = carousel.add_subparsers(dest="cmd", required=True)
-    cg = csub.add_parser("generate", help="Generate a carousel")
+
+def _add_carousel_generate(sub):
+    cg = sub.add_parser("generate", help="Generate a carousel")
     cg.add_argument("--entity", required=True)
     cg.add_argument("--topic", required=True)
     cg.add_argument("--slides", type=int)
     cg.set_defaults(func=cmd_carousel_generate)
 
-    # ── social ──
-    social = sub.add_parser("social", help="Social post generation")
-    ssub = social.add_subparsers(dest="cmd", required=True)
-    sg = ssub.add_parser("generate", help="Generate a social post")
+
+def _add_social_generate(sub):
+    sg = sub.add_parser("generate", help="Generate a social post")
     sg.add_argument("--entity", required=True)
     sg.add_argument("--topic", required=True)
     sg.set_defaults(func=cmd_social_generate)
 
-    # ── release ──
-    release = sub.add_parser("release", help="Music release management")
-    rsub = release.add_subparsers(dest="cmd", required=True)
 
-    rl = rsub.add_parser("list", help="List releases for an artist")
+def _add_release_list(sub):
+    rl = sub.add_parser("list", help="List releases for an artist")
     rl.add_argument("--artist", required=True)
     rl.set_defaults(func=cmd_release_list)
 
-    ra = rsub.add_parser("assets", help="List release assets")
+
+def _add_release_assets(sub):
+    ra = sub.add_parser("assets", help="List release assets")
     ra.add_argument("--artist", required=True)
     ra.add_argument("--release", required=True)
     ra.add_argument("--refresh", action="store_true")
     ra.set_defaults(func=cmd_release_assets)
 
-    rr = rsub.add_parser("run", help="Run release pipeline")
+
+def _add_release_run(sub):
+    rr = sub.add_parser("run", help="Run release pipeline")
     rr.add_argument("--artist", required=True)
     rr.add_argument("--release", required=True)
     rr.set_defaults(func=cmd_release_run)
 
-    # ── entities ──
-    entities = sub.add_parser("entities", help="Entity management")
-    esub = entities.add_subparsers(dest="cmd", required=True)
 
-    el = esub.add_parser("list", help="List entities")
+def _add_entities_list(sub):
+    el = sub.add_parser("list", help="List entities")
     el.add_argument("--type", help="Filter by type (artist, influencer, meme_account, ...)")
     el.set_defaults(func=cmd_entities_list)
 
-    eg = esub.add_parser("get", help="Get entity by slug")
+
+def _add_entities_get(sub):
+    eg = sub.add_parser("get", help="Get entity by slug")
     eg.add_argument("slug")
     eg.set_defaults(func=cmd_entities_get)
 
-    # ── config ──
-    config = sub.add_parser("config", help="CLI configuration")
-    cfgsub = config.add_subparsers(dest="cmd", required=True)
 
-    csu = cfgsub.add_parser("set-url", help="Set Studio API base URL")
+def _add_config_set_url(sub):
+    csu = sub.add_parser("set-url", help="Set Studio API base URL")
     csu.add_argument("url")
     csu.set_defaults(func=cmd_config_set_url)
 
-    cst = cfgsub.add_parser("set-token", help="Set API auth token")
+
+def _add_config_set_token(sub):
+    cst = sub.add_parser("set-token", help="Set API auth token")
     cst.add_argument("token")
     cst.set_defaults(func=cmd_config_set_token)
 
-    csh = cfgsub.add_parser("show", help="Show current config")
+
+def _add_config_show(sub):
+    csh = sub.add_parser("show", help="Show current config")
     csh.set_defaults(func=cmd_config_show)
 
+
+_COMMANDS = {
+    "leads": ("Lead management & discovery", {
+        "list": _add_leads_list,
+        "get": _add_leads_get,
+        "create": _add_leads_create,
+        "update": _add_leads_update,
+        "delete": _add_leads_delete,
+        "discover": _add_leads_discover,
+        "batch": _add_leads_batch,
+        "batch-status": _add_leads_batch_status,
+    }),
+    "kanban": ("Kanban task management", {
+        "list": _add_kanban_list,
+        "get": _add_kanban_get,
+        "create": _add_kanban_create,
+        "update": _add_kanban_update,
+        "poll": _add_kanban_poll,
+        "handoff": _add_kanban_handoff,
+    }),
+    "meme": ("Meme generation", {
+        "generate": _add_meme_generate,
+    }),
+    "carousel": ("Carousel generation", {
+        "generate": _add_carousel_generate,
+    }),
+    "social": ("Social post generation", {
+        "generate": _add_social_generate,
+    }),
+    "release": ("Music release management", {
+        "list": _add_release_list,
+        "assets": _add_release_assets,
+        "run": _add_release_run,
+    }),
+    "entities": ("Entity management", {
+        "list": _add_entities_list,
+        "get": _add_entities_get,
+    }),
+    "config": ("CLI configuration", {
+        "set-url": _add_config_set_url,
+        "set-token": _add_config_set_token,
+        "show": _add_config_show,
+    }),
+}
+
+
+def _sniff_subcommand(argv: list[str]) -> tuple[str | None, str | None]:
+    """Return the (group, cmd) named in argv; None where the full listing is needed."""
+    if not argv or argv[0] not in _COMMANDS:
+        return None, None
+    group = argv[0]
+    if len(argv) > 1 and argv[1] in _COMMANDS[group][1]:
+        return group, argv[1]
+    return group, None
+
+
+def build_parser(
+    group: str | None = None, cmd: str | None = None, with_help: bool = True
+) -> argparse.ArgumentParser:
+    """
+    Build the CLI parser, registering only the given group/command when known.
+
+    with_help=False skips the -h/--help action on every (sub)parser; main()
+    uses it when help was not asked for.
+    """
+    import argparse
+
+    parser_class = functools.partial(argparse.ArgumentParser, add_help=with_help)
+    p = parser_class(
+        prog="sunderlabs",
+        description="Sunderlabs Studio CLI",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    p.add_argument("-v", "--version", action="version", version=f"%(prog)s {__version__}")
+    p.add_argument("--no-cache", action="store_true", help="Bypass the local GET cache for read commands")
+    sub = p.add_subparsers(dest="group", required=True, parser_class=parser_class)
+    for group_name, (group_help, commands) in _COMMANDS.items():
+        if group is not None and group_name != group:
+            continue
+        gp = sub.add_parser(group_name, help=group_help)
+        gsub = gp.add_subparsers(dest="cmd", required=True, parser_class=parser_class)
+        for cmd_name, add_command in commands.items():
+            if cmd is None or cmd_name == cmd:
+                add_command(gsub)
     return p
 
 
 def main():
-    parser = build_parser()
-    args = parser.parse_args()
+    argv = sys.argv[1:]
+
+    # Fast paths: answered before argparse is even imported
+    if argv in (["--version"], ["-v"]):
+        print(f"sunderlabs {__version__}")
+        return
+    if argv == ["config", "show"]:
+        cmd_config_show(None)
+        return
+
+    global _USE_CACHE
+    group, cmd = _sniff_subcommand([a for a in argv if a != "--no-cache"])
+    parser = build_parser(group, cmd, with_help="-h" in argv or "--help" in argv)
+    args = parser.parse_args(argv)
+    _USE_CACHE = not args.no_cache
     if hasattr(args, "func"):
         args.func(args)
     else:
@@ -25,20 +25,19 @@ Optional:
   PICOCLAW_WEAVE_OBSERVE  — "1" to emit WEAVE_TOOL_EVENT lines
   PICOCLAW_TRACES_DB_URL  — PostgreSQL URL for trace recording
   PICOCLAW_CONTAINER_START — float timestamp of container start
+  PICOCLAW_TASK_TIMEOUT   — seconds from container start before the agent is
+                            terminated (default: no limit)
 """
 
 import os
 import sys
 import re
 import json
-import glob
 import time
-import shutil
 import logging
 import threading
 import subprocess
-import urllib.request
-import urllib.error
+from collections import OrderedDict
 
 logging.basicConfig(
     level=logging.INFO,
@@ -46,11 +45,36 @@ logging.basicConfig(
 )
 log = logging.getLogger("task-runner")
 
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:  # stdlib fallback when orjson isn't installed
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _json_loads = json.loads
+
+
+def _json_text(obj) -> str:
+    """Serialize for TEXT columns (args_json, tools_json)."""
+    return _json_dumps(obj).decode()
+
+
 # ── Config from env ────────────────────────────────────────────────────────────
 PICOCLAW_BIN   = os.environ.get("PICOCLAW_BIN", "picoclaw")
 PICOCLAW_DEBUG = os.environ.get("PICOCLAW_DEBUG", "").lower() in ("1", "true", "yes")
+TASK_TIMEOUT   = float(os.environ.get("PICOCLAW_TASK_TIMEOUT", "0") or 0)
 WORKSPACE      = os.path.expanduser("~/.picoclaw/workspace")
 
+# Agent stdout is buffered only as a reply fallback; keep the last ~500 KB
+_STDOUT_CAP  = 1_000_000
+_STDOUT_KEEP = 500_000
+
+# Pipe and upload read size
+_READ_BLOCK = 1 << 16
+
 # Telegram
 _TG_BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN", "")
 _TG_API_BASE  = f"https://api.telegram.org/bot{_TG_BOT_TOKEN}" if _TG_BOT_TOKEN else ""
@@ -60,6 +84,10 @@ _TRACES_DB_URL = os.environ.get("PICOCLAW_TRACES_DB_URL", "")
 
 # Non-blocking tool_events writer
 _TOOL_EVENT_QUEUE: "queue.Queue | None" = None
+_TOOL_EVENT_WRITER: "threading.Thread | None" = None
+_TOOL_EVENT_DROPPED = 0  # ops lost to a full queue
+_TOOL_EVENT_BATCH  = 200   # max queued ops per flush
+_TOOL_EVENT_LINGER = 0.05  # seconds to wait for more ops before flushing
 
 
 def _pg_connect():
@@ -67,94 +95,244 @@ def _pg_connect():
     return psycopg2.connect(_TRACES_DB_URL)
 
 
-def _init_tool_events_table() -> None:
-    """Create tool_events table and start background writer thread."""
-    global _TOOL_EVENT_QUEUE
-    if not _TRACES_DB_URL:
+def _pg_close(conn) -> None:
+    """Close a connection being abandoned; it may already be dead."""
+    if conn is None:
         return
     try:
-        import queue
-        conn = _pg_connect()
-        cur  = conn.cursor()
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS tool_events (
-                id          BIGSERIAL PRIMARY KEY,
-                task_id     TEXT NOT NULL,
-                persona     TEXT,
-                tool        TEXT NOT NULL,
-                args_json   TEXT,
-                iteration   INTEGER,
-                status      TEXT NOT NULL DEFAULT 'running',
-                duration_ms INTEGER,
-                result_len  INTEGER,
-                error       TEXT,
-                started_at  DOUBLE PRECISION NOT NULL
-            )
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tool_events_task_id ON tool_events (task_id)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tool_events_started_at ON tool_events (started_at)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tool_events_persona ON tool_events (persona)")
-        # Add persona column if table already exists without it
-        cur.execute("""
-            DO $$ BEGIN
-                ALTER TABLE tool_events ADD COLUMN IF NOT EXISTS persona TEXT;
-            EXCEPTION WHEN duplicate_column THEN NULL;
-            END $$;
-        """)
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tool_events_persona ON tool_events (persona) WHERE persona IS NOT NULL")
-        conn.commit()
-        cur.close()
         conn.close()
-    except Exception as e:
-        log.warning(f"tool_events table init failed: {e}")
-        return
+    except Exception:
+        pass
+
+
+def _ensure_tool_events_table(conn) -> None:
+    cur = conn.cursor()
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS tool_events (
+            id          BIGSERIAL PRIMARY KEY,
+            task_id     TEXT NOT NULL,
+            persona     TEXT,
+            tool        TEXT NOT NULL,
+            args_json   TEXT,
+            iteration   INTEGER,
+            status      TEXT NOT NULL DEFAULT 'running',
+            duration_ms INTEGER,
+            result_len  INTEGER,
+            error       TEXT,
+            started_at  DOUBLE PRECISION NOT NULL
+        )
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tool_events_task_id ON tool_events (task_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tool_events_started_at ON tool_events (started_at)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tool_events_persona ON tool_events (persona)")
+    # Add persona column if table already exists without it
+    cur.execute("""
+        DO $$ BEGIN
+            ALTER TABLE tool_events ADD COLUMN IF NOT EXISTS persona TEXT;
+        EXCEPTION WHEN duplicate_column THEN NULL;
+        END $$;
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_tool_events_persona ON tool_events (persona) WHERE persona IS NOT NULL")
+    conn.commit()
+    cur.close()
 
-    _TOOL_EVENT_QUEUE = queue.Queue(maxsize=1000)
+
+def _init_tool_events_table() -> None:
+    """Start the background tool_events writer.
+
+    The writer creates the table on its own connection before draining the
+    queue, so the DDL round-trips overlap agent startup instead of
+    delaying it. Events emitted meanwhile simply wait in the queue.
+    """
+    global _TOOL_EVENT_QUEUE, _TOOL_EVENT_WRITER
+    if not _TRACES_DB_URL:
+        return
+    import queue
+    q = _TOOL_EVENT_QUEUE = queue.Queue(maxsize=1000)
 
     def _writer():
-        while True:
-            op = _TOOL_EVENT_QUEUE.get()
+        global _TOOL_EVENT_QUEUE
+        try:
+            import psycopg2
+            conn = _pg_connect()
+            _ensure_tool_events_table(conn)
+        except Exception as e:
+            log.warning(f"tool_events table init failed: {e}")
+            _TOOL_EVENT_QUEUE = None  # stop emitters; queued ops are discarded
+            return
+        stop = False
+        while not stop:
+            op = q.get()
             if op is None:
                 break
+            # Coalesce whatever arrives within the linger window into one flush
+            batch    = [op]
+            deadline = time.monotonic() + _TOOL_EVENT_LINGER
+            while len(batch) < _TOOL_EVENT_BATCH:
+                try:
+                    op = q.get(timeout=max(deadline - time.monotonic(), 0.001))
+                except queue.Empty:
+                    break
+                if op is None:
+                    stop = True
+                    break
+                batch.append(op)
+            # Traces get their own transaction after the tool_events flush, so
+            # a failing trace can't roll back event rows or vice versa.
+            traces = [op for op in batch if op["action"] == "trace"]
+            if traces:
+                batch = [op for op in batch if op["action"] != "trace"]
+            for attempt in range(2 if batch else 0):
+                try:
+                    if conn is None or conn.closed:
+                        conn = _pg_connect()
+                    _flush_tool_events(conn, batch)
+                    break
+                except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                    # Dropped connection: the transaction was rolled back, so
+                    # replay the batch once on a fresh one.
+                    _pg_close(conn)
+                    conn = None
+                    if attempt == 0:
+                        continue
+                    log.warning(f"tool_events write failed: {e}")
+                except Exception as e:
+                    # A bad op aborts the whole transaction; replay the batch
+                    # one op at a time so only that op is lost.
+                    log.warning(f"tool_events batch write failed, retrying per op: {e}")
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        _pg_close(conn)
+                        conn = None
+                        break
+                    conn = _flush_tool_events_singly(conn, batch)
+                    break
+            for op in traces:
+                try:
+                    if conn is None or conn.closed:
+                        conn = _pg_connect()
+                    cur = conn.cursor()
+                    cur.execute(_TRACE_SQL, op["params"])
+                    conn.commit()
+                    cur.close()
+                    op["landed"].append(True)
+                except Exception as e:
+                    log.warning(f"Trace write on tool_events connection failed: {e}")
+                    try:
+                        conn.rollback()
+                    except Exception:
+                        _pg_close(conn)
+                        conn = None
+        if conn is not None:
+            conn.close()
+        if _TOOL_EVENT_DROPPED:
+            log.warning(f"tool_events queue overflowed: dropped {_TOOL_EVENT_DROPPED} events")
+
+    log.info("tool_events realtime writer starting")
+    _TOOL_EVENT_WRITER = threading.Thread(target=_writer, daemon=True)
+    _TOOL_EVENT_WRITER.start()
+
+
+def _flush_tool_events(conn, batch: list) -> None:
+    """Write a batch of queued ops in one transaction, one statement per action."""
+    from psycopg2.extras import execute_values
+    starts   = [op for op in batch if op["action"] == "start"]
+    contexts = [op for op in batch if op["action"] == "context"]
+    dones    = [op for op in batch if op["action"] == "done"]
+    errors   = [op for op in batch if op["action"] == "error"]
+    cur = conn.cursor()
+    if starts:
+        rows = execute_values(cur, """
+            INSERT INTO tool_events
+              (task_id, persona, tool, args_json, iteration, status, started_at)
+            VALUES %s
+            RETURNING id
+        """, [
+            (op["task_id"], op.get("persona") or None, op["tool"], op["args_json"], op["iteration"], op["started_at"])
+            for op in starts
+        ], template="(%s, %s, %s, %s, %s, 'running', %s)", page_size=len(starts), fetch=True)
+        # ids come from the sequence in VALUES order. Fill the boxes now so
+        # done/error ops later in this batch can resolve their row.
+        for op, row_id in zip(starts, sorted(row[0] for row in rows)):
+            op["id_box"][:] = [row_id]
+    # A done/error whose start never got a row (dropped or failed) is skipped
+    dones  = [op for op in dones if op["id_box"]]
+    errors = [op for op in errors if op["id_box"]]
+    if contexts:
+        execute_values(cur, """
+            INSERT INTO tool_events
+              (task_id, persona, tool, args_json, iteration, status, duration_ms, result_len, started_at)
+            VALUES %s
+        """, [
+            (op["task_id"], op.get("persona") or None, op["args_json"], op["iteration"], op["started_at"])
+            for op in contexts
+        ], template="(%s, %s, '__context__', %s, %s, 'done', 0, 0, %s)", page_size=len(contexts))
+    if dones:
+        execute_values(cur, """
+            UPDATE tool_events AS t
+               SET status='done', duration_ms=v.duration_ms, result_len=v.result_len
+              FROM (VALUES %s) AS v (id, duration_ms, result_len)
+             WHERE t.id = v.id
+        """, [(op["id_box"][0], op["duration_ms"], op["result_len"]) for op in dones], page_size=len(dones))
+    if errors:
+        execute_values(cur, """
+            UPDATE tool_events AS t
+               SET status='error', duration_ms=v.duration_ms, error=v.error
+              FROM (VALUES %s) AS v (id, duration_ms, error)
+             WHERE t.id = v.id
+        """, [(op["id_box"][0], op["duration_ms"], op["error"]) for op in errors], page_size=len(errors))
+    conn.commit()
+    cur.close()
+
+
+def _flush_tool_events_singly(conn, batch: list):
+    """Write each op of a failed batch in its own transaction.
+
+    Returns the connection, or None if it had to be abandoned.
+    """
+    for i, op in enumerate(batch):
+        try:
+            _flush_tool_events(conn, [op])
+        except Exception as e:
+            log.warning(f"tool_events {op['action']} write failed: {e}")
+            if op["action"] == "start":
+                op["id_box"][:] = []  # drop the id from the rolled-back batch
             try:
-                conn = _pg_connect()
-                cur  = conn.cursor()
-                if op["action"] == "start":
-                    cur.execute("""
-                        INSERT INTO tool_events
-                          (task_id, persona, tool, args_json, iteration, status, started_at)
-                        VALUES (%s, %s, %s, %s, %s, 'running', %s)
-                        RETURNING id
-                    """, (op["task_id"], op.get("persona") or None, op["tool"], op["args_json"], op["iteration"], op["started_at"]))
-                    row = cur.fetchone()
-                    if row:
-                        op["id_box"].append(row[0])
-                elif op["action"] == "done" and op.get("row_id"):
-                    cur.execute("""
-                        UPDATE tool_events
-                           SET status='done', duration_ms=%s, result_len=%s
-                         WHERE id=%s
-                    """, (op["duration_ms"], op["result_len"], op["row_id"]))
-                elif op["action"] == "error" and op.get("row_id"):
-                    cur.execute("""
-                        UPDATE tool_events
-                           SET status='error', duration_ms=%s, error=%s
-                         WHERE id=%s
-                    """, (op["duration_ms"], op["error"], op["row_id"]))
-                elif op["action"] == "context":
-                    cur.execute("""
-                        INSERT INTO tool_events
-                          (task_id, persona, tool, args_json, iteration, status, duration_ms, result_len, started_at)
-                        VALUES (%s, %s, '__context__', %s, %s, 'done', 0, 0, %s)
-                    """, (op["task_id"], op.get("persona") or None, op["args_json"], op["iteration"], op["started_at"]))
-                conn.commit()
-                cur.close()
-                conn.close()
-            except Exception as e:
-                log.warning(f"tool_events write failed: {e}")
-
-    threading.Thread(target=_writer, daemon=True).start()
-    log.info("tool_events realtime writer started")
+                conn.rollback()
+            except Exception:
+                _pg_close(conn)
+                log.warning(f"tool_events connection lost: dropped {len(batch) - i - 1} events")
+                return None
+    return conn
+
+
+def _enqueue_tool_event(op: dict) -> None:
+    """put_nowait with a drop policy for when the writer falls behind.
+
+    Context events are the least valuable and are dropped outright; any
+    other op evicts the oldest queued context event to make room. Starts,
+    dones, errors, the trace and the stop sentinel are never evicted; if
+    no context event is queued the incoming op is dropped instead.
+    """
+    global _TOOL_EVENT_DROPPED
+    import queue
+    q = _TOOL_EVENT_QUEUE
+    try:
+        q.put_nowait(op)
+        return
+    except queue.Full:
+        pass
+    _TOOL_EVENT_DROPPED += 1
+    if op["action"] == "context":
+        return
+    with q.mutex:
+        for i, queued in enumerate(q.queue):
+            if queued is not None and queued["action"] == "context":
+                # Swap in place: the size is unchanged, so no waiter needs waking
+                del q.queue[i]
+                q.queue.append(op)
+                return
 
 
 def _emit_tool_start(task_id: str, tool: str, args: dict, iteration: int, persona: str = "") -> list:
@@ -163,12 +341,12 @@ def _emit_tool_start(task_id: str, tool: str, args: dict, iteration: int, person
     if _TOOL_EVENT_QUEUE is None:
         return id_box
     try:
-        _TOOL_EVENT_QUEUE.put_nowait({
+        _enqueue_tool_event({
             "action":     "start",
             "task_id":    task_id,
             "persona":    persona or os.environ.get("PICOCLAW_PERSONA", ""),
             "tool":       tool,
-            "args_json":  json.dumps(args),
+            "args_json":  _json_text(args),
             "iteration":  iteration,
             "started_at": time.time(),
             "id_box":     id_box,
@@ -179,18 +357,14 @@ def _emit_tool_start(task_id: str, tool: str, args: dict, iteration: int, person
 
 
 def _emit_tool_done(id_box: list, duration_ms: int, result_len: int) -> None:
-    if _TOOL_EVENT_QUEUE is None or not id_box:
-        return
-    # id_box is populated asynchronously — spin-wait up to 2s
-    deadline = time.time() + 2.0
-    while not id_box and time.time() < deadline:
-        time.sleep(0.05)
-    if not id_box:
+    # The writer drains the queue in order, so it fills id_box from the start
+    # op before it reaches this one — no need to wait for the row id here.
+    if _TOOL_EVENT_QUEUE is None:
         return
     try:
-        _TOOL_EVENT_QUEUE.put_nowait({
+        _enqueue_tool_event({
             "action":      "done",
-            "row_id":      id_box[0],
+            "id_box":      id_box,
             "duration_ms": duration_ms,
             "result_len":  result_len,
         })
@@ -199,17 +373,12 @@ def _emit_tool_done(id_box: list, duration_ms: int, result_len: int) -> None:
 
 
 def _emit_tool_error(id_box: list, duration_ms: int, error: str) -> None:
-    if _TOOL_EVENT_QUEUE is None or not id_box:
-        return
-    deadline = time.time() + 2.0
-    while not id_box and time.time() < deadline:
-        time.sleep(0.05)
-    if not id_box:
+    if _TOOL_EVENT_QUEUE is None:
         return
     try:
-        _TOOL_EVENT_QUEUE.put_nowait({
+        _enqueue_tool_event({
             "action":      "error",
-            "row_id":      id_box[0],
+            "id_box":      id_box,
             "duration_ms": duration_ms,
             "error":       error,
         })
@@ -221,11 +390,11 @@ def _emit_context_event(task_id: str, event: dict) -> None:
     if _TOOL_EVENT_QUEUE is None:
         return
     try:
-        _TOOL_EVENT_QUEUE.put_nowait({
+        _enqueue_tool_event({
             "action":     "context",
             "task_id":    task_id,
             "persona":    os.environ.get("PICOCLAW_PERSONA", ""),
-            "args_json":  json.dumps(event),
+            "args_json":  _json_text(event),
             "iteration":  int(event.get("iteration", 0) or 0),
             "started_at": time.time(),
         })
@@ -234,15 +403,72 @@ def _emit_context_event(task_id: str, event: dict) -> None:
 
 
 # ── Telegram helpers ───────────────────────────────────────────────────────────
+# One keep-alive HTTPS connection per thread: a reply fans out into several
+# sendMessage chunks and file uploads, which would otherwise each pay a fresh
+# TCP+TLS handshake to api.telegram.org.
+_TG_LOCAL = threading.local()
+_TG_UPLOAD_WORKERS = 4
+
+
+def _tg_connection():
+    conn = getattr(_TG_LOCAL, "conn", None)
+    if conn is None:
+        import http.client
+        conn = http.client.HTTPSConnection("api.telegram.org", timeout=60)
+        _TG_LOCAL.conn = conn
+    return conn
+
+
+def _tg_reset_connection() -> None:
+    conn = getattr(_TG_LOCAL, "conn", None)
+    if conn is not None:
+        conn.close()
+        _TG_LOCAL.conn = None
+
+
+def _tg_post(method: str, body, content_type: str, timeout: float, length: int | None = None) -> dict:
+    """POST to the Bot API over the shared connection; raises on transport errors.
+
+    body may be bytes, or a callable returning a fresh iterable of byte
+    chunks (so a streamed upload can be replayed on retry) with its total
+    size passed as length.
+    """
+    import http.client
+    path    = f"/bot{_TG_BOT_TOKEN}/{method}"
+    headers = {"Content-Type": content_type}
+    if length is not None:
+        headers["Content-Length"] = str(length)
+    for attempt in range(2):
+        conn   = _tg_connection()
+        reused = conn.sock is not None
+        if reused:
+            conn.sock.settimeout(timeout)
+        else:
+            conn.timeout = timeout
+        try:
+            conn.request("POST", path, body=body() if callable(body) else body, headers=headers)
+            resp = conn.getresponse()
+            raw  = resp.read()
+        except (http.client.HTTPException, ConnectionError):
+            _tg_reset_connection()
+            if reused and attempt == 0:
+                continue  # server dropped an idle keep-alive socket; retry on a fresh one
+            raise
+        except OSError:
+            _tg_reset_connection()
+            raise
+        if resp.will_close:
+            _tg_reset_connection()
+        return _json_loads(raw)
+    return {}
+
+
 def _tg_request(method: str, payload: dict) -> dict:
     if not _TG_API_BASE:
         return {}
-    url  = f"{_TG_API_BASE}/{method}"
-    data = json.dumps(payload).encode()
-    req  = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    data = _json_dumps(payload)
     try:
-        with urllib.request.urlopen(req, timeout=35) as resp:
-            return json.loads(resp.read())
+        return _tg_post(method, data, "application/json", timeout=35)
     except Exception as e:
         log.error(f"Telegram {method} error: {e}")
         return {}
@@ -257,34 +483,79 @@ def _tg_send(chat_id: int, text: str) -> None:
             log.error(f"Telegram sendMessage failed: {result}")
 
 
-def _tg_send_file(chat_id: int, path: str) -> None:
+# Common agent outputs; anything else falls back to mimetypes, whose first
+# use parses the system mime.types files.
+_FAST_MIME = {
+    ".png":  "image/png",
+    ".jpg":  "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif":  "image/gif",
+    ".webp": "image/webp",
+    ".pdf":  "application/pdf",
+    ".zip":  "application/zip",
+    ".json": "application/json",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    ".xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ".txt":  "text/plain",
+    ".md":   "text/markdown",
+    ".csv":  "text/csv",
+    ".html": "text/html",
+}
+
+
+def _mime(path: str) -> str:
+    mime = _FAST_MIME.get(os.path.splitext(path)[1].lower())
+    if mime:
+        return mime
     import mimetypes
-    mime = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def _tg_send_file(chat_id: int, path: str) -> None:
+    mime = _mime(path)
     is_image = mime.startswith("image/")
     method   = "sendPhoto" if is_image else "sendDocument"
     field    = "photo"     if is_image else "document"
-    import urllib.parse
     boundary = "----PicoTaskBoundary"
-    with open(path, "rb") as fh:
-        file_data = fh.read()
     filename = os.path.basename(path)
-    body  = f"--{boundary}\r\nContent-Disposition: form-data; name=\"chat_id\"\r\n\r\n{chat_id}\r\n"
-    body += f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\nContent-Type: {mime}\r\n\r\n"
-    body_bytes = body.encode() + file_data + f"\r\n--{boundary}--\r\n".encode()
-    req = urllib.request.Request(
-        f"{_TG_API_BASE}/{method}",
-        data=body_bytes,
-        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
-    )
+    head  = f"--{boundary}\r\nContent-Disposition: form-data; name=\"chat_id\"\r\n\r\n{chat_id}\r\n"
+    head += f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\nContent-Type: {mime}\r\n\r\n"
+    head_bytes = head.encode()
+    tail_bytes = f"\r\n--{boundary}--\r\n".encode()
+
+    # Stream the file from disk rather than building the whole body in memory
+    def _body():
+        yield head_bytes
+        with open(path, "rb") as fh:
+            while chunk := fh.read(_READ_BLOCK):
+                yield chunk
+        yield tail_bytes
+
     try:
-        with urllib.request.urlopen(req, timeout=60) as resp:
-            result = json.loads(resp.read())
-            if not result.get("ok"):
-                log.warning(f"Failed to send file {filename}: {result}")
+        length = len(head_bytes) + os.path.getsize(path) + len(tail_bytes)
+        result = _tg_post(method, _body, f"multipart/form-data; boundary={boundary}", timeout=60, length=length)
+        if not result.get("ok"):
+            log.warning(f"Failed to send file {filename}: {result}")
     except Exception as e:
         log.warning(f"Failed to send file {filename}: {e}")
 
 
+def _tg_send_files(chat_id: int, paths: list) -> None:
+    """Upload files concurrently; each worker thread keeps its own connection."""
+    def _send(path):
+        _tg_send_file(chat_id, path)
+        log.info(f"Sent file: {os.path.basename(path)}")
+
+    if len(paths) <= 1:
+        for path in paths:
+            _send(path)
+        return
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(_TG_UPLOAD_WORKERS, len(paths))) as ex:
+        list(ex.map(_send, paths))
+
+
 # ── Kanban helpers ──────────────────────────────────────────────────────────────
 def _kanban_finish(kanban_id: str, success: bool, summary: str) -> None:
     if not kanban_id:
@@ -300,14 +571,11 @@ def _kanban_finish(kanban_id: str, success: bool, summary: str) -> None:
 # Patterns emitted by picoclaw --debug:
 #   agent: Tool call: write_file({"path":...}) {agent_id=main, tool=write_file, iteration=1}
 #   tool: Tool execution completed {tool=write_file, duration_ms=0, result_length=95}
-_TOOL_CALL_RE = re.compile(
-    r'agent: Tool call: (\w+)\((.*)?\) \{.*?iteration=(\d+)\}'
-)
-_TOOL_DONE_RE = re.compile(
-    r'tool: Tool execution completed \{tool=(\w+), duration_ms=(\d+), result_length=(\d+)'
-)
-_TOOL_ERROR_RE = re.compile(
-    r'tool: Tool execution failed \{tool=(\w+), duration_ms=(\d+), error=(.+?)\}'
+# All three fused into one alternation so each stderr line is scanned once.
+_TOOL_RE = re.compile(
+    r'agent: Tool call: (?P<call_tool>\w+)\((?P<call_args>.*)?\) \{.*?iteration=(?P<call_iter>\d+)\}'
+    r'|tool: Tool execution completed \{tool=(?P<done_tool>\w+), duration_ms=(?P<done_ms>\d+), result_length=(?P<done_len>\d+)'
+    r'|tool: Tool execution failed \{tool=(?P<err_tool>\w+), duration_ms=(?P<err_ms>\d+), error=(?P<err_msg>.+?)\}'
 )
 _CONTEXT_EVENT_MARKER = "CONTEXT_EVENT:"
 
@@ -319,20 +587,66 @@ def _parse_context_event(line: str) -> dict | None:
     if not payload:
         return None
     try:
-        parsed = json.loads(payload)
+        parsed = _json_loads(payload)
         return parsed if isinstance(parsed, dict) else None
     except Exception:
         return None
 
 
-def _tee_stderr(proc, result_box: list, task_id: str = "") -> None:
-    """Read stderr, log it, and extract tool call events from picoclaw debug lines."""
+# Identical agent stderr lines are logged at most once per window
+_LOG_DEDUP_WINDOW = 1.0
+_LOG_DEDUP_SIZE   = 64
+
+
+def _drain_pipes(proc, stdout_buf: bytearray):
+    """Drain the agent's stdout and stderr from one thread.
+
+    stdout is appended to stdout_buf (capped to its tail); stderr is
+    yielded line by line. Both pipes are read in 64 KB blocks.
+    """
+    import selectors
+    sel = selectors.DefaultSelector()
+    sel.register(proc.stdout.fileno(), selectors.EVENT_READ, "out")
+    sel.register(proc.stderr.fileno(), selectors.EVENT_READ, "err")
+    tail = b""
+    try:
+        while sel.get_map():
+            for key, _ in sel.select():
+                chunk = os.read(key.fd, _READ_BLOCK)
+                if not chunk:
+                    sel.unregister(key.fd)
+                    continue
+                if key.data == "out":
+                    stdout_buf += chunk
+                    if len(stdout_buf) > _STDOUT_CAP:
+                        del stdout_buf[:len(stdout_buf) - _STDOUT_KEEP]
+                    continue
+                lines = (tail + chunk).split(b"\n")
+                tail  = lines.pop()
+                for raw in lines:
+                    yield raw.decode("utf-8", errors="replace").rstrip()
+    finally:
+        sel.close()
+    if tail:
+        yield tail.decode("utf-8", errors="replace").rstrip()
+
+
+def _tee(proc, stdout_buf: bytearray, result_box: list, task_id: str = "") -> None:
+    """Drain agent output, log stderr, and extract tool call events from picoclaw debug lines."""
     tool_events = []
     pending: dict = {}  # tool_name -> deque[{ev, id_box}]  (FIFO per tool name)
-
-    for raw in iter(proc.stderr.readline, b""):
-        line = raw.decode("utf-8", errors="replace").rstrip()
-        log.info(f"[agent] {line}")
+    recent:  OrderedDict = OrderedDict()  # line -> last logged (monotonic), for log dedup
+
+    for line in _drain_pipes(proc, stdout_buf):
+        # Drop repeats of a recently logged line (retry loops, heartbeats)
+        now  = time.monotonic()
+        seen = recent.get(line)
+        if seen is None or now - seen >= _LOG_DEDUP_WINDOW:
+            log.info(f"[agent] {line}")
+            recent[line] = now
+            recent.move_to_end(line)
+            if len(recent) > _LOG_DEDUP_SIZE:
+                recent.popitem(last=False)
 
         # Parse structured context telemetry events.
         context_event = _parse_context_event(line)
@@ -340,14 +654,20 @@ def _tee_stderr(proc, result_box: list, task_id: str = "") -> None:
             _emit_context_event(task_id, context_event)
             continue
 
+        # Most lines are free-form logs; skip the regex unless a tool marker is present
+        if "Tool " not in line:
+            continue
+        m = _TOOL_RE.search(line)
+        if not m:
+            continue
+
         # Parse "Tool call: name(args) {... iteration=N}"
-        m = _TOOL_CALL_RE.search(line)
-        if m:
-            tool_name = m.group(1)
-            args_raw  = m.group(2) or ""
-            iteration = int(m.group(3))
+        if m.group("call_tool"):
+            tool_name = m.group("call_tool")
+            args_raw  = m.group("call_args") or ""
+            iteration = int(m.group("call_iter"))
             try:
-                args = json.loads(args_raw) if args_raw.endswith("}") else {"cmd": args_raw}
+                args = _json_loads(args_raw) if args_raw.endswith("}") else {"cmd": args_raw}
             except Exception:
                 args = {"cmd": args_raw}
             ev = {
@@ -363,11 +683,10 @@ def _tee_stderr(proc, result_box: list, task_id: str = "") -> None:
             continue
 
         # Parse "Tool execution completed {tool=..., duration_ms=..., result_length=...}"
-        m = _TOOL_DONE_RE.search(line)
-        if m:
-            tool_name   = m.group(1)
-            duration_ms = int(m.group(2))
-            result_len  = int(m.group(3))
+        if m.group("done_tool"):
+            tool_name   = m.group("done_tool")
+            duration_ms = int(m.group("done_ms"))
+            result_len  = int(m.group("done_len"))
             queue = pending.get(tool_name)
             entry = queue.pop(0) if queue else None
             if queue is not None and not queue:
@@ -377,19 +696,14 @@ def _tee_stderr(proc, result_box: list, task_id: str = "") -> None:
             ev["result_length"] = result_len
             tool_events.append(ev)
             if entry:
-                threading.Thread(
-                    target=_emit_tool_done,
-                    args=(entry["id_box"], duration_ms, result_len),
-                    daemon=True,
-                ).start()
+                _emit_tool_done(entry["id_box"], duration_ms, result_len)
             continue
 
         # Parse "Tool execution failed {tool=..., duration_ms=..., error=...}"
-        m = _TOOL_ERROR_RE.search(line)
-        if m:
-            tool_name   = m.group(1)
-            duration_ms = int(m.group(2))
-            error_msg   = m.group(3).strip()
+        if m.group("err_tool"):
+            tool_name   = m.group("err_tool")
+            duration_ms = int(m.group("err_ms"))
+            error_msg   = m.group("err_msg").strip()
             queue = pending.get(tool_name)
             entry = queue.pop(0) if queue else None
             if queue is not None and not queue:
@@ -400,11 +714,7 @@ def _tee_stderr(proc, result_box: list, task_id: str = "") -> None:
             ev["is_error"]    = True
             tool_events.append(ev)
             if entry:
-                threading.Thread(
-                    target=_emit_tool_error,
-                    args=(entry["id_box"], duration_ms, error_msg),
-                    daemon=True,
-                ).start()
+                _emit_tool_error(entry["id_box"], duration_ms, error_msg)
             continue
 
     # Flush any pending calls that never got a completion line (e.g. agent killed)
@@ -414,15 +724,23 @@ def _tee_stderr(proc, result_box: list, task_id: str = "") -> None:
             ev["is_error"] = True
             ev["error"]    = "no completion line (agent may have been killed)"
             tool_events.append(ev)
-            threading.Thread(
-                target=_emit_tool_error,
-                args=(entry["id_box"], 0, "no completion line"),
-                daemon=True,
-            ).start()
+            _emit_tool_error(entry["id_box"], 0, "no completion line")
 
     result_box.append(tool_events)
 
 
+_TRACE_SQL = """
+    INSERT INTO traces
+      (task_id, gateway, sender, preview, exit_code, started_at, ended_at,
+       duration_ms, tool_count, error_count, tools_json)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (task_id) DO UPDATE SET
+        exit_code=EXCLUDED.exit_code, ended_at=EXCLUDED.ended_at,
+        duration_ms=EXCLUDED.duration_ms, tool_count=EXCLUDED.tool_count,
+        error_count=EXCLUDED.error_count, tools_json=EXCLUDED.tools_json
+"""
+
+
 def _record_trace(task_id: str, sender: str, subject: str, tool_events: list,
                   exit_code: int, started_at: float, ended_at: float) -> None:
     if not _TRACES_DB_URL:
@@ -434,27 +752,36 @@ def _record_trace(task_id: str, sender: str, subject: str, tool_events: list,
         gateway = "email"
     else:
         gateway = "kanban"
+    params = (
+        task_id, gateway, sender, subject[:200],
+        exit_code, started_at, ended_at,
+        round((ended_at - started_at) * 1000),
+        len(tool_events),
+        sum(1 for e in tool_events if e.get("is_error")),
+        _json_text(tool_events),
+    )
+
+    # Hand the trace to the tool_events writer so it reuses the already-open
+    # connection right after the final tool_events flush; then stop the
+    # writer and wait for it to drain. If the trace didn't land there (init
+    # failed, write failed, or the writer is stuck), write it directly.
+    q = _TOOL_EVENT_QUEUE
+    if q is not None and _TOOL_EVENT_WRITER is not None:
+        landed: list = []
+        try:
+            q.put({"action": "trace", "params": params, "landed": landed}, timeout=5)
+            q.put(None, timeout=5)
+            _TOOL_EVENT_WRITER.join(timeout=10)
+        except Exception as e:
+            log.warning(f"Trace handoff to writer failed: {e}")
+        if landed:
+            return
+
     try:
         import psycopg2
         conn = psycopg2.connect(_TRACES_DB_URL)
         cur  = conn.cursor()
-        cur.execute("""
-            INSERT INTO traces
-              (task_id, gateway, sender, preview, exit_code, started_at, ended_at,
-               duration_ms, tool_count, error_count, tools_json)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (task_id) DO UPDATE SET
-                exit_code=EXCLUDED.exit_code, ended_at=EXCLUDED.ended_at,
-                duration_ms=EXCLUDED.duration_ms, tool_count=EXCLUDED.tool_count,
-                error_count=EXCLUDED.error_count, tools_json=EXCLUDED.tools_json
-        """, (
-            task_id, gateway, sender, subject[:200],
-            exit_code, started_at, ended_at,
-            round((ended_at - started_at) * 1000),
-            len(tool_events),
-            sum(1 for e in tool_events if e.get("is_error")),
-            json.dumps(tool_events),
-        ))
+        cur.execute(_TRACE_SQL, params)
         conn.commit()
         cur.close()
         conn.close()
@@ -463,30 +790,23 @@ def _record_trace(task_id: str, sender: str, subject: str, tool_events: list,
 
 
 # ── Reply file helpers ─────────────────────────────────────────────────────────
+def _pop_file(path: str) -> str:
+    """Return a file's stripped text and delete it; "" if missing or unreadable."""
+    try:
+        with open(path, "rb") as f:
+            content = f.read().decode("utf-8", errors="replace").strip()
+        os.remove(path)
+        return content
+    except Exception:
+        return ""
+
+
 def _read_task_reply(task_id: str) -> str:
-    path = os.path.join(WORKSPACE, "tasks", f"{task_id}_reply.md")
-    if os.path.exists(path):
-        try:
-            with open(path) as f:
-                content = f.read().strip()
-            os.remove(path)
-            return content
-        except Exception:
-            pass
-    return ""
+    return _pop_file(os.path.join(WORKSPACE, "tasks", f"{task_id}_reply.md"))
 
 
 def _read_reply_file() -> str:
-    path = os.path.join(WORKSPACE, "reply.md")
-    if os.path.exists(path):
-        try:
-            with open(path) as f:
-                content = f.read().strip()
-            os.remove(path)
-            return content
-        except Exception:
-            pass
-    return ""
+    return _pop_file(os.path.join(WORKSPACE, "reply.md"))
 
 
 _NOISE_PREFIXES = (
@@ -517,16 +837,22 @@ _NOISE_SUBSTRINGS = (
     "injected by the system",
 )
 
+# One alternation instead of per-line any() loops over both tuples. MULTILINE
+# lets a single search over the whole buffer rule out any noise at all.
+_NOISE_RE = re.compile(
+    "^(?:" + "|".join(map(re.escape, _NOISE_PREFIXES)) + ")"
+    "|" + "|".join(map(re.escape, _NOISE_SUBSTRINGS)),
+    re.MULTILINE,
+)
+
+
 def _clean_output(text: str) -> str:
     lines = text.splitlines()
-    out = []
-    for line in lines:
-        if any(line.startswith(p) for p in _NOISE_PREFIXES):
-            continue
-        if any(s in line for s in _NOISE_SUBSTRINGS):
-            continue
-        out.append(line)
-    return "\n".join(out).strip()
+    joined = "\n".join(lines)  # normalise every splitlines() boundary for ^
+    noise = _NOISE_RE.search
+    if not noise(joined):
+        return joined.strip()
+    return "\n".join(line for line in lines if not noise(line)).strip()
 
 
 # ── Persona setup ──────────────────────────────────────────────────────────────
@@ -537,6 +863,17 @@ def _apply_persona(task_id: str) -> None:
     persona_src  = os.path.join(personas_dir, persona, "IDENTITY.md")
     if persona != "max" and os.path.exists(persona_src):
         try:
+            # copy2 preserves mtime, so a matching size+mtime means the
+            # persona is already in place from a previous task.
+            src = os.stat(persona_src)
+            try:
+                dst = os.stat(identity_dst)
+                if (dst.st_size, dst.st_mtime_ns) == (src.st_size, src.st_mtime_ns):
+                    log.info(f"Persona '{persona}' already set for task {task_id}")
+                    return
+            except FileNotFoundError:
+                pass
+            import shutil
             shutil.copy2(persona_src, identity_dst)
             log.info(f"Persona set to '{persona}' for task {task_id}")
         except Exception as e:
@@ -549,6 +886,7 @@ def _cleanup_task(task_id: str) -> None:
     tmp_dir = os.path.join(WORKSPACE, "tasks", task_id, "tmp")
     if os.path.isdir(tmp_dir):
         try:
+            import shutil
             shutil.rmtree(tmp_dir)
             log.info(f"Deleted tmp dir for task {task_id}")
         except Exception as e:
@@ -561,14 +899,29 @@ def _cleanup_task(task_id: str) -> None:
             log.info(f"Deleted plan file for task {task_id}")
         except Exception:
             pass
-    # Also clean up any legacy plans/ dir files from older agents
+    # Also clean up the legacy plans/ scratch dir from older agents
     plans_dir = os.path.join(WORKSPACE, "plans")
     if os.path.isdir(plans_dir):
-        for f in glob.glob(os.path.join(plans_dir, "*.md")):
-            try:
-                os.remove(f)
-            except Exception:
-                pass
+        import shutil
+        shutil.rmtree(plans_dir, ignore_errors=True)
+
+
+def _wait_agent(proc, container_start: float) -> None:
+    """Wait for the agent, terminating it once PICOCLAW_TASK_TIMEOUT has elapsed."""
+    if not TASK_TIMEOUT:
+        proc.wait()
+        return
+    try:
+        proc.wait(timeout=max(container_start + TASK_TIMEOUT - time.time(), 0))
+        return
+    except subprocess.TimeoutExpired:
+        log.error(f"Agent exceeded {TASK_TIMEOUT:.0f}s task timeout — terminating")
+    proc.terminate()
+    try:
+        proc.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
 
 
 # ── Main task runner ───────────────────────────────────────────────────────────
@@ -576,13 +929,13 @@ def run(task_id: str) -> None:
     task_file = os.path.join(WORKSPACE, "tasks", f"{task_id}.json")
 
     log.info(f"Task runner: loading task {task_id}")
-    if not os.path.exists(task_file):
+    try:
+        with open(task_file, "rb") as f:
+            task = _json_loads(f.read())
+    except FileNotFoundError:
         log.error(f"Task file not found: {task_file}")
         sys.exit(1)
 
-    with open(task_file) as f:
-        task = json.load(f)
-
     full_prompt = task["prompt"]
     sender      = task.get("sender", "")
     kanban_id   = task.get("kanban_id", "") or os.environ.get("PICOCLAW_KANBAN_ID", "")
@@ -600,12 +953,13 @@ def run(task_id: str) -> None:
 
     # Clear stale session history to avoid context poisoning across tasks
     session_file = os.path.join(WORKSPACE, "sessions", "agent_main_main.json")
-    if os.path.exists(session_file):
-        try:
-            os.remove(session_file)
-            log.info(f"Cleared stale session for task {task_id}")
-        except Exception as e:
-            log.warning(f"Could not clear session: {e}")
+    try:
+        os.remove(session_file)
+        log.info(f"Cleared stale session for task {task_id}")
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        log.warning(f"Could not clear session: {e}")
 
     # GitHub App token
     try:
@@ -623,11 +977,10 @@ def run(task_id: str) -> None:
 
     # Clear stale reply.md
     reply_md = os.path.join(WORKSPACE, "reply.md")
-    if os.path.exists(reply_md):
-        try:
-            os.remove(reply_md)
-        except Exception:
-            pass
+    try:
+        os.remove(reply_md)
+    except Exception:
+        pass
 
     # ── Run picoclaw agent ─────────────────────────────────────────────────────
     cmd = [PICOCLAW_BIN, "agent"]
@@ -637,25 +990,18 @@ def run(task_id: str) -> None:
 
     log.info(f"Running: {' '.join(cmd[:3])} -m <{len(full_prompt)} chars>")
 
-    result_box:    list = []
-    stdout_chunks: list = []
+    result_box: list = []
+    stdout_buf = bytearray()
     container_start = float(os.environ.get("PICOCLAW_CONTAINER_START", str(time.time())))
 
     _init_tool_events_table()
 
-    def _tee_stdout(p, chunks):
-        for line in iter(p.stdout.readline, b""):
-            chunks.append(line)
-
     started_at = time.time()
-    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=os.environ.copy())
-    t_err = threading.Thread(target=_tee_stderr, args=(proc, result_box, task_id), daemon=True)
-    t_out = threading.Thread(target=_tee_stdout, args=(proc, stdout_chunks), daemon=True)
-    t_err.start()
-    t_out.start()
-    proc.wait()
-    t_err.join(timeout=5)
-    t_out.join(timeout=5)
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    t_tee = threading.Thread(target=_tee, args=(proc, stdout_buf, result_box, task_id), daemon=True)
+    t_tee.start()
+    _wait_agent(proc, container_start)
+    t_tee.join(timeout=5)
     ended_at   = time.time()
     tool_events = result_box[0] if result_box else []
 
@@ -663,9 +1009,10 @@ def run(task_id: str) -> None:
 
     try:
         # ── Read reply ─────────────────────────────────────────────────────────
-        reply = _clean_output(_read_task_reply(task_id) or _read_reply_file())
+        # Reply files are agent-authored; only the raw stdout fallback needs scrubbing.
+        reply = _read_task_reply(task_id) or _read_reply_file()
         if not reply:
-            raw = b"".join(stdout_chunks).decode("utf-8", errors="replace")
+            raw = stdout_buf.decode("utf-8", errors="replace")
             reply = _clean_output(raw)
         if not reply or reply.strip() == "I've completed processing but have no response to give.":
             reply = f"✅ Task done (exit {proc.returncode}) — no reply written."
@@ -681,11 +1028,12 @@ def run(task_id: str) -> None:
             log.info(f"Telegram reply sent to chat_id={tg_chat_id} for task {task_id}")
             # Send any files the agent dropped into reply-files/<task_id>/
             reply_files_dir = os.path.join(WORKSPACE, "reply-files", task_id)
-            if os.path.isdir(reply_files_dir):
-                for fpath in sorted(glob.glob(os.path.join(reply_files_dir, "*"))):
-                    if os.path.isfile(fpath):
-                        _tg_send_file(tg_chat_id, fpath)
-                        log.info(f"Sent file: {os.path.basename(fpath)}")
+            try:
+                with os.scandir(reply_files_dir) as it:
+                    files = sorted(e.path for e in it if not e.name.startswith(".") and e.is_file())
+            except (FileNotFoundError, NotADirectoryError):
+                files = []
+            _tg_send_files(tg_chat_id, files)
 
         else:
             # No channel configured — write to reply.md as fallback
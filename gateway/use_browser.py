@@ -36,16 +36,15 @@ Required env vars (set automatically in agent containers):
 
 import os
 import sys
-import subprocess
 
 TOOL = "/app/scripts/browser_use_tool.py"
 
 
 def main():
-    # Pass all args straight through to browser_use_tool.py
-    cmd = [sys.executable, TOOL] + sys.argv[1:]
-    result = subprocess.run(cmd, env=os.environ.copy())
-    sys.exit(result.returncode)
+    # Pass all args straight through to browser_use_tool.py. exec replaces
+    # this process, so no second interpreter waits on the first and the
+    # tool's exit code becomes ours.
+    os.execv(sys.executable, [sys.executable, TOOL] + sys.argv[1:])
 
 
 if __name__ == "__main__":
@@ -13,12 +13,22 @@ Usage:
 
 import argparse
 import asyncio
+import base64
 import json
 import os
 import sys
 import traceback
 from pathlib import Path
 
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:  # stdlib fallback when orjson isn't installed
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
 
 def _build_llm():
     openrouter_key = os.environ.get("OPENROUTER_API_KEY", "")
@@ -75,12 +85,13 @@ async def run_browser_task(
 
     screenshot_path = None
     if save_screenshot:
-        import base64
         screenshots = history.screenshots()
         if screenshots:
             out = Path(save_screenshot)
             out.parent.mkdir(parents=True, exist_ok=True)
-            out.write_bytes(base64.b64decode(screenshots[-1]))
+            raw = screenshots[-1]
+            # Already-decoded bytes are written as-is; skip the base64 round-trip
+            out.write_bytes(raw if isinstance(raw, (bytes, bytearray)) else base64.b64decode(raw))
             screenshot_path = str(out)
 
     errors = [str(e) for e in (history.errors() or []) if e is not None]
@@ -132,13 +143,15 @@ def main():
             "traceback": traceback.format_exc(),
         }
 
-    output_json = json.dumps(result, indent=2, ensure_ascii=False)
-    print(output_json)
+    output_json = _json_dumps(result)
+    sys.stdout.flush()  # anything already printed through the text layer goes first
+    sys.stdout.buffer.write(output_json + b"\n")
+    sys.stdout.buffer.flush()
 
     if args.output:
         out_path = Path(args.output)
         out_path.parent.mkdir(parents=True, exist_ok=True)
-        out_path.write_text(output_json, encoding="utf-8")
+        out_path.write_bytes(output_json)
 
     sys.exit(0 if result.get("success") else 1)
 